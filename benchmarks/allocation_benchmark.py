@@ -0,0 +1,54 @@
+"""
+Value allocation benchmark: MCS value objects allocated by `mcs debug` (both engines).
+The program keeps every value it computes in a list, so tracemalloc still sees them once it has run.
+
+Usage (from the repository root):
+    python -m benchmarks.allocation_benchmark [iteration count]
+"""
+from minecraft_script import parse_code
+from minecraft_script.interpreter import types
+from .synthetic import generate_loop, debug_engines
+from sys import argv
+import tracemalloc
+import gc
+import os
+
+# the values appended to the list every iteration:
+loop_body = (
+    "values.append(i % 100);\n"
+    "values.append(i % 2 == 0);\n"
+    "values.append(null);\n"
+    "values.append(i * 1000);"
+)
+VALUES_PER_ITERATION = 4
+
+
+def run_benchmark(iteration_count: int) -> None:
+    ast = parse_code(generate_loop(iteration_count, loop_body, declarations="var values = [];\n"), use_cache=False)
+    interpreter_filter = tracemalloc.Filter(True, os.path.join(os.path.dirname(types.__file__), "*"))
+
+    for engine_name, run_engine in debug_engines:
+        gc.collect()
+        tracemalloc.start()
+        start_snapshot = tracemalloc.take_snapshot().filter_traces((interpreter_filter,))
+
+        result = run_engine(ast)  # keeps the values alive until they are measured
+
+        gc.collect()
+        end_snapshot = tracemalloc.take_snapshot().filter_traces((interpreter_filter,))
+        _, peak_size = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        statistics = end_snapshot.compare_to(start_snapshot, "filename")
+        block_count = sum(statistic.count_diff for statistic in statistics)
+        retained_size = sum(statistic.size_diff for statistic in statistics)
+        del result
+
+        value_count = iteration_count * VALUES_PER_ITERATION
+        print(f"{engine_name + ':' :<10} {value_count} values, {block_count} blocks allocated by the interpreter "
+              f"({block_count / value_count: 0.2f} per value, {retained_size / 1_000_000: 0.2f} MB), "
+              f"peak traced memory {peak_size / 1_000_000: 0.2f} MB")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(argv[1]) if len(argv) > 1 else 50_000)
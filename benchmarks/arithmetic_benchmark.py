@@ -0,0 +1,30 @@
+"""
+Arithmetic benchmark: number operations per second in `mcs debug` (both engines).
+
+Usage (from the repository root):
+    python -m benchmarks.arithmetic_benchmark [operation count]
+"""
+from minecraft_script import parse_code
+from .synthetic import generate_loop, debug_engines
+from time import perf_counter
+from sys import argv
+
+OPERATIONS_PER_ITERATION = 8  # 6 in the first statement, the loop condition and the counter increment
+
+
+def run_benchmark(operation_count: int) -> None:
+    iteration_count = operation_count // OPERATIONS_PER_ITERATION
+    code = generate_loop(iteration_count, "set total = total + i * 3 - i / 2 + i % 7;", declarations="var total = 0;\n")
+    ast = parse_code(code, use_cache=False)
+
+    for engine_name, run_engine in debug_engines:
+        start_time = perf_counter()
+        run_engine(ast)
+        total_time = perf_counter() - start_time
+
+        print(f"{engine_name + ':' :<10} {iteration_count * OPERATIONS_PER_ITERATION} operations in {total_time: 0.3f}s "
+              f"({iteration_count * OPERATIONS_PER_ITERATION / total_time / 1_000_000: 0.2f}M operations/s)")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(argv[1]) if len(argv) > 1 else 1_000_000)
@@ -0,0 +1,35 @@
+"""
+Concatenation benchmark: strings and lists built piece by piece in `mcs debug` (both engines).
+
+Usage (from the repository root):
+    python -m benchmarks.concatenation_benchmark [iteration count]
+"""
+from minecraft_script import parse_code
+from .synthetic import generate_loop, debug_engines
+from time import perf_counter
+from sys import argv
+
+# every loop appends one piece per iteration and reads the length of the result at the end:
+loop_bodies = {
+    "string +": ('var text = "";', 'set text = text + "tp @s ~ ~1 ~";', "text"),
+    "concatenate()": ('var text = "";', 'set text = concatenate(text, "tp @s ~ ~1 ~");', "text"),
+    "list +": ("var items = [];", "set items = items + [i];", "items"),
+}
+
+
+def run_benchmark(iteration_count: int) -> None:
+    for loop_name, loop_body in loop_bodies.items():
+        declaration, statement, name = loop_body
+        code = generate_loop(iteration_count, statement, f"{declaration}\n", f"var length = {name}.length;\n")
+        ast = parse_code(code, use_cache=False)
+
+        for engine_name, run_engine in debug_engines:
+            start_time = perf_counter()
+            run_engine(ast)
+            total_time = perf_counter() - start_time
+
+            print(f"{loop_name + ':' :<16} {engine_name + ':' :<10} {iteration_count} iterations in {total_time: 0.3f}s")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(argv[1]) if len(argv) > 1 else 10_000)
@@ -0,0 +1,60 @@
+"""
+Debug engine benchmark: tree-walking interpreter vs. closure compiler on the example programs.
+Every example is run with a loop that calls its functions (parsing isn't timed, compiling is).
+Builtins (e.g. concatenate() and command() in gigantificator) are shared by both engines,
+so examples that spend most of their time in them gain the least.
+
+Usage (from the repository root):
+    python -m benchmarks.debug_benchmark [iteration count]
+"""
+from minecraft_script import parse_code
+from minecraft_script.interpreter.closure_compiler import run_compiled
+from .synthetic import run_tree
+from contextlib import redirect_stdout
+from time import perf_counter
+from sys import argv
+import os
+
+# functions called by the benchmark loop of each example:
+example_calls = {
+    "copy_paste": "save_blocks_local(); place_blocks_local();",
+    "gigantificator": "toggle_size();",
+    "test": "test_fnc(); toggle_active();",
+    "tick_counter": "main();",
+}
+
+
+def time_engine(run_engine, ast, repeat: int) -> float:
+    best_time = float("inf")
+    with open(os.devnull, "wt") as devnull, redirect_stdout(devnull):  # examples log their state
+        for _ in range(repeat):
+            start_time = perf_counter()
+            run_engine(ast)
+            best_time = min(best_time, perf_counter() - start_time)
+
+    return best_time
+
+
+def run_benchmark(iteration_count: int, repeat: int = 5) -> None:
+    total_tree_time = total_closure_time = 0
+
+    for name, calls in example_calls.items():
+        with open(f"examples/{name}.mcs", "rt", encoding="utf-8") as file:
+            code = file.read()
+
+        code += f"\nfor (benchmark_iteration in range({iteration_count})) {{ {calls} }}\n"
+        ast = parse_code(code, use_cache=False)
+
+        tree_time = time_engine(run_tree, ast, repeat)
+        closure_time = time_engine(run_compiled, ast, repeat)
+        total_tree_time += tree_time
+        total_closure_time += closure_time
+
+        print(f"{name + ':' :<16} tree {tree_time: 0.4f}s, closures {closure_time: 0.4f}s ({tree_time / closure_time: 0.1f}x)")
+
+    print(f"{'Total:' :<16} tree {total_tree_time: 0.4f}s, closures {total_closure_time: 0.4f}s "
+          f"({total_tree_time / total_closure_time: 0.1f}x)")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(argv[1]) if len(argv) > 1 else 2_000)
@@ -0,0 +1,44 @@
+"""
+Interpreter dispatch benchmark: node visits per second in a tight while loop.
+
+Usage (from the repository root):
+    python -m benchmarks.interpreter_benchmark [iteration count]
+"""
+from minecraft_script import parse_code
+from minecraft_script.interpreter.interpreter import Interpreter, InterpreterContext
+from .synthetic import generate_loop
+from time import perf_counter
+from sys import argv
+
+
+class CountingInterpreter(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.visit_count = 0
+
+    def visit(self, node, context):
+        self.visit_count += 1
+        return super().visit(node, context)
+
+
+def run_benchmark(iteration_count: int, repeat: int = 5) -> None:
+    code = generate_loop(iteration_count, "set total = total + i * 2 - 1;", declarations="var total = 0;\n")
+    ast = parse_code(code, use_cache=False)
+
+    # count visits once (the counting subclass is slower, so it isn't timed):
+    counting_interpreter = CountingInterpreter()
+    counting_interpreter.visit(ast, InterpreterContext(top_level=True))
+    visit_count = counting_interpreter.visit_count
+
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = perf_counter()
+        Interpreter().visit(ast, InterpreterContext(top_level=True))
+        best_time = min(best_time, perf_counter() - start_time)
+
+    print(f"Loop: {iteration_count} iterations, {visit_count} node visits")
+    print(f"Best of {repeat}: {best_time: 0.4f}s ({visit_count / best_time / 1_000_000: 0.2f}M visits/s)")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(argv[1]) if len(argv) > 1 else 20_000)
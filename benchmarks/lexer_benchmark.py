@@ -0,0 +1,28 @@
+"""
+Lexer throughput benchmark.
+
+Usage (from the repository root):
+    python -m benchmarks.lexer_benchmark [statement count]
+"""
+from minecraft_script.lexer.lexer import Lexer
+from .synthetic import generate_source
+from time import perf_counter
+from sys import argv
+
+
+def run_benchmark(statement_count: int, repeat: int = 5) -> None:
+    code = generate_source(statement_count)
+
+    best_time = float("inf")
+    token_count = 0
+    for _ in range(repeat):
+        start_time = perf_counter()
+        token_count = len(Lexer(code).tokenize())
+        best_time = min(best_time, perf_counter() - start_time)
+
+    print(f"Source size: {len(code)} characters, {code.count(chr(10))} lines, {token_count} tokens")
+    print(f"Best of {repeat}: {best_time: 0.4f}s ({len(code) / best_time / 1_000_000: 0.2f} MB/s)")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(argv[1]) if len(argv) > 1 else 20_000)
@@ -0,0 +1,44 @@
+"""
+Parser memory benchmark: bytes retained by the AST (nodes and tokens) per node.
+
+Usage (from the repository root):
+    python -m benchmarks.memory_benchmark [statement count]
+"""
+from minecraft_script import parse_code
+from minecraft_script.lexer.tokens import Token
+from minecraft_script.parser.nodes import ParserNode
+from .synthetic import generate_source
+from sys import argv
+import tracemalloc
+import gc
+
+
+def count_instances(cls) -> int:
+    return sum(isinstance(obj, cls) for obj in gc.get_objects())
+
+
+def run_benchmark(statement_count: int) -> None:
+    code = generate_source(statement_count)
+
+    gc.collect()
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+
+    ast = parse_code(code, use_cache=False)  # measure a real parse, not a load from the AST cache
+
+    gc.collect()
+    end_size, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ast_size = end_size - start_size
+    node_count = count_instances(ParserNode)
+    token_count = count_instances(Token)
+
+    print(f"Source size: {len(code)} characters, {statement_count} statements")
+    print(f"AST: {node_count} nodes, {token_count} tokens, {ast_size / 1_000_000: 0.2f} MB retained")
+    print(f"Bytes per node (tokens included): {ast_size / node_count: 0.1f}")
+    print(f"Peak traced memory while parsing: {peak_size / 1_000_000: 0.2f} MB")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(argv[1]) if len(argv) > 1 else 20_000)
@@ -0,0 +1,47 @@
+from minecraft_script.interpreter.interpreter import Interpreter, InterpreterContext
+from minecraft_script.interpreter.closure_compiler import run_compiled
+
+
+def generate_source(statement_count: int) -> str:
+    """
+    Generate a large, syntactically valid mcs program by repeating
+    a handful of statement templates with unique names.
+    """
+    templates = (
+        'var variable_name_{i} = {i} + some_longer_identifier_{i} * (3 - other_value);',
+        'function function_name_{i}(alpha, beta) {{ return alpha >= beta && beta <= {i} || !alpha; }}',
+        'log("a string literal with some text {i}", \'single quoted {i}\');  // trailing comment {i}',
+        'if (x == {i}) {{ set y[{i}] = [1, 2, 3]; }} else if (y < 2) {{ set x = x % 4; }} else {{ x.length; }}',
+        '@e[type=minecraft:zombie, tag=tag_{i}] log(alpha - beta);',
+        'for (item in range({i})) {{ async while (true) {{ command("say hi"); }} }}',
+    )
+
+    return "\n".join(templates[i % len(templates)].format(i=i) for i in range(statement_count)) + "\n"
+
+
+def generate_loop(iteration_count: int, body: str, declarations: str = "", after: str = "") -> str:
+    """
+    Generate a while loop that runs `body` (one or more statements)
+    `iteration_count` times, with `i` as the loop counter.
+    """
+    indented_body = "".join(f"    {statement}\n" for statement in body.split("\n"))
+
+    return (
+        f"{declarations}"
+        "var i = 0;\n"
+        f"while (i < {iteration_count}) {{\n"
+        f"{indented_body}"
+        "    set i = i + 1;\n"
+        "}\n"
+        f"{after}"
+    )
+
+
+def run_tree(ast) -> InterpreterContext:
+    context = InterpreterContext(top_level=True)
+    Interpreter().visit(ast, context)
+    return context  # callers can keep the values alive until they are measured
+
+
+# both `mcs debug` engines, as (name, function running an AST):
+debug_engines = (("tree", run_tree), ("closures", run_compiled))
@@ -1,18 +1,37 @@
 from .lexer.lexer import Lexer
 from .parser.parser import Parser
 from .interpreter.interpreter import Interpreter, InterpreterContext, SymbolTable
+from .interpreter.closure_compiler import run_compiled
+from .interpreter.resolver import resolve_names
+from .interpreter.scheduler import TickScheduler
+from .interpreter.builtin_functions import builtin_names
+from .ast_cache import get_cached_ast, save_cached_ast
+from .common import COMMON_CONFIG
 
 
-def debug_code(code_input: str, *, print_variables: bool = False) -> None:
-    lexer = Lexer(code_input)
-    parser = Parser(lexer.tokenize())
+def debug_code(code_input: str, *, print_variables: bool = False, print_loop_report: bool = None,
+               engine: str = None) -> None:
+    ast = parse_code(code_input)
+    engine = COMMON_CONFIG["debug_engine"] if engine is None else engine
+    print_loop_report = COMMON_CONFIG["debug_loop_report"] if print_loop_report is None else print_loop_report
+    resolver = resolve_names(ast, builtin_names)  # reports undefined names before anything is run
+    scheduler = TickScheduler()  # simulated game ticks for async loops
 
-    interpreter = Interpreter()
-    context = InterpreterContext(top_level=True)
-    interpreter.visit(parser.parse(), context)
+    if engine == "closure":  # compile the AST into closures once, then run them
+        frame = run_compiled(ast, resolver, scheduler)
+        symbols = frame.get_symbols()
+    else:
+        interpreter = Interpreter(scheduler=scheduler)
+        context = InterpreterContext(top_level=True)
+        interpreter.visit(ast, context)
+        scheduler.run()
+        symbols = context.symbol_table.symbols
 
     if print_variables:
-        print(context.symbol_table.symbols)
+        print(symbols)
+
+    if print_loop_report:
+        scheduler.report()
 
     print("\n\nCode ended with no errors.")
 
@@ -26,7 +45,7 @@ def run_shell():
             text = input('> ')
 
         run_lexer = Lexer(text)
-        tokens = run_lexer.tokenize()
+        tokens = run_lexer.iter_tokens()
 
         run_parser = Parser(tokens)
         ast = run_parser.parse()
@@ -35,11 +54,21 @@ def run_shell():
         print(run_interpreter.visit(ast, context))
 
 
-def parse_code(code: str):
+def parse_code(code: str, *, use_cache: bool = None):
+    use_cache = COMMON_CONFIG["ast_cache"] if use_cache is None else use_cache
+
+    if use_cache:
+        ast = get_cached_ast(code)
+        if ast is not None:  # unchanged source, skip lexing & parsing entirely
+            return ast
+
     run_lexer = Lexer(code + "\n")
-    tokens = run_lexer.tokenize()
+    tokens = run_lexer.iter_tokens()
 
     run_parser = Parser(tokens)
     ast = run_parser.parse()
 
+    if use_cache:
+        save_cached_ast(code, ast)
+
     return ast
@@ -0,0 +1,200 @@
+import gc
+import marshal
+from contextlib import contextmanager
+import os
+import os.path
+from hashlib import sha256
+from sys import version_info
+from zlib import compress, decompress, error as ZlibError
+from .common import COMMON_CONFIG, module_folder, version
+from .lexer.tokens import Token
+from .parser import nodes
+
+CACHE_FORMAT_VERSION = 1
+CACHE_FILE_EXTENSION = ".mcsast"
+
+# Encoding tags (first element of every encoded tuple):
+NODE_TAG = 0
+TOKEN_TAG = 1
+LIST_TAG = 2
+TUPLE_TAG = 3
+DICT_TAG = 4
+
+# Node types, in a fixed order (index is used as type id in the binary format):
+node_types: tuple[type, ...] = tuple(sorted(
+    (obj for obj in vars(nodes).values() if isinstance(obj, type) and issubclass(obj, nodes.ParserNode)),
+    key=lambda node_type: node_type.__name__
+))
+node_type_ids: dict[type, int] = {node_type: i for i, node_type in enumerate(node_types)}
+
+
+def _parser_source_hash() -> bytes:
+    # grammar and lexer/parser sources, so local edits to them (without a version bump) invalidate the cache
+    source_hash = sha256()
+    for source_file in (
+        "lexer/grammar/LANG_TOKENS.json", "lexer/grammar/LANG_KEYWORDS.json",
+        "lexer/lexer.py", "lexer/tokens.py", "parser/parser.py", "parser/nodes.py",
+    ):
+        with open(f"{module_folder}/{source_file}", "rb") as file:
+            source_hash.update(file.read())
+
+    return source_hash.digest()
+
+
+# everything that changes the resulting AST apart from the source code itself:
+cache_key_prefix = (
+    f"mcs-ast:{CACHE_FORMAT_VERSION}:{version}:{version_info[0]}.{version_info[1]}:"
+    f"{','.join(f'{node_type.__name__}({node_type.__slots__})' for node_type in node_types)}:"
+).encode() + _parser_source_hash()
+
+
+# ----------------- Serialization ----------------- :
+def encode_ast(value) -> any:
+    if isinstance(value, nodes.ParserNode):
+        return (NODE_TAG, node_type_ids[type(value)]) + tuple(
+            encode_ast(getattr(value, slot)) for slot in type(value).__slots__
+        )
+
+    if isinstance(value, Token):
+        return TOKEN_TAG, value.value, value.tt_type, value.position, value.variant
+
+    if isinstance(value, list):
+        return (LIST_TAG,) + tuple(encode_ast(item) for item in value)
+
+    if isinstance(value, tuple):
+        return (TUPLE_TAG,) + tuple(encode_ast(item) for item in value)
+
+    if isinstance(value, dict):
+        return (DICT_TAG,) + tuple(value.keys()) + tuple(encode_ast(item) for item in value.values())
+
+    return value  # str, int, bool or None
+
+
+def decode_ast(value) -> any:
+    if not isinstance(value, tuple):
+        return value
+
+    tag = value[0]
+
+    if tag == NODE_TAG:
+        node_type = node_types[value[1]]
+        node = node_type.__new__(node_type)
+        for slot, slot_value in zip(node_type.__slots__, value[2:]):
+            setattr(node, slot, decode_ast(slot_value))
+
+        return node
+
+    if tag == TOKEN_TAG:
+        return Token(*value[1:])
+
+    if tag == LIST_TAG:
+        return [decode_ast(item) for item in value[1:]]
+
+    if tag == TUPLE_TAG:
+        return tuple(decode_ast(item) for item in value[1:])
+
+    if tag == DICT_TAG:
+        item_count = (len(value) - 1) // 2
+        keys = value[1:1 + item_count]
+        values = value[1 + item_count:]
+        return {key: decode_ast(item) for key, item in zip(keys, values)}
+
+    raise ValueError(f"Unknown AST cache tag {tag !r}")
+
+
+@contextmanager
+def paused_gc():
+    # ASTs are acyclic, so the garbage collector would only rescan every newly created object
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def dump_ast(ast: nodes.ParserNode) -> bytes:
+    with paused_gc():
+        return compress(marshal.dumps(encode_ast(ast)), 1)
+
+
+def load_ast(data: bytes) -> nodes.ParserNode:
+    with paused_gc():
+        return decode_ast(marshal.loads(decompress(data)))
+
+
+# ----------------- Cache directory ----------------- :
+def get_cache_folder() -> str:
+    return os.path.expanduser(COMMON_CONFIG["ast_cache_path"])
+
+
+def get_cache_key(code: str) -> str:
+    return sha256(cache_key_prefix + code.encode("utf-8")).hexdigest()
+
+
+def get_cached_ast(code: str) -> nodes.ParserNode | None:
+    cache_file_path = os.path.join(get_cache_folder(), get_cache_key(code) + CACHE_FILE_EXTENSION)
+
+    try:
+        with open(cache_file_path, "rb") as cache_file:
+            ast = load_ast(cache_file.read())
+        os.utime(cache_file_path)  # mark as recently used (eviction is based on modification time)
+    except (OSError, EOFError, ValueError, TypeError, IndexError, ZlibError):  # missing or unreadable cache entry
+        return None
+
+    return ast
+
+
+def save_cached_ast(code: str, ast: nodes.ParserNode) -> None:
+    cache_folder = get_cache_folder()
+    cache_file_path = os.path.join(cache_folder, get_cache_key(code) + CACHE_FILE_EXTENSION)
+    temp_file_path = f"{cache_file_path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        with open(temp_file_path, "wb") as cache_file:
+            cache_file.write(dump_ast(ast))
+        os.replace(temp_file_path, cache_file_path)  # atomic, so concurrent builds never read partial files
+    except OSError:  # caching is only an optimization, never fail a build because of it
+        return
+
+    evict_cache_entries(cache_folder, COMMON_CONFIG["ast_cache_max_size"] * 1_000_000)
+
+
+def evict_cache_entries(cache_folder: str, max_size: int) -> None:
+    entries = []
+    for entry in os.scandir(cache_folder):
+        if not entry.name.endswith(CACHE_FILE_EXTENSION):
+            continue
+
+        try:
+            stat = entry.stat()
+        except OSError:  # removed by another process in the meantime
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):  # least recently used first
+        if total_size <= max_size:
+            break
+
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+
+
+def clear_cache() -> int:
+    cache_folder = get_cache_folder()
+    if not os.path.isdir(cache_folder):
+        return 0
+
+    removed_count = 0
+    for entry in os.scandir(cache_folder):
+        if entry.name.endswith(CACHE_FILE_EXTENSION):
+            os.remove(entry.path)
+            removed_count += 1
+
+    return removed_count
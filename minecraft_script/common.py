@@ -1,5 +1,5 @@
 import json
-from uuid import uuid4 as _uuid4
+import inspect
 
 version = "0.2.2"
 module_folder = "/".join(__file__.split('\\')[:-1])
@@ -9,5 +9,18 @@ with open(f"{module_folder}/config.json", "rt", encoding="utf-8") as file:
     COMMON_CONFIG: dict = json.loads(file.read())
 
 
-def generate_uuid() -> str:
-    return str(_uuid4())
+def get_visit_method(cls: type, node_type: type, prefix: str = "visit_", fallback: str = "visit_unknown"):
+    """
+    Looks up the visit method of an interpreter class for a node type.
+    The returned function is always called as method(interpreter, node, context).
+    """
+    method_name = f"{prefix}{node_type.__name__}"
+    if getattr(cls, method_name, None) is None:
+        method_name = fallback
+
+    method = inspect.getattr_static(cls, method_name)
+    if isinstance(method, staticmethod):
+        static_function = method.__func__
+        return lambda _, node, context: static_function(node, context)
+
+    return getattr(cls, method_name)
@@ -1,7 +1,10 @@
 from .. import parse_code
 from .compiler import Compiler
+from hashlib import sha256
 
 
-def build_datapack(code: str, datapack_name: str, output_path: str, verbose: bool = False) -> None:
+def build_datapack(code: str, datapack_name: str, output_path: str, verbose: bool = False, *,
+                   incremental: bool = False) -> None:
     ast = parse_code(code)
-    Compiler(ast, datapack_name, output_path, verbose).build()
+    source_hash = sha256(code.encode('utf-8')).hexdigest()
+    Compiler(ast, datapack_name, output_path, verbose, incremental=incremental, source_hash=source_hash).build()
@@ -1,2 +0,0 @@
-scoreboard players set .out mcs_math 0
-execute if score .a mcs_math = .b mcs_math run scoreboard players set .out mcs_math 1
\ No newline at end of file
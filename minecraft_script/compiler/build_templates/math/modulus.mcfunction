@@ -1,2 +0,0 @@
-scoreboard players operation .out mcs_math = .a mcs_math
-scoreboard players operation .out mcs_math %= .b mcs_math
\ No newline at end of file
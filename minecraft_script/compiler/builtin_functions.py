@@ -78,7 +78,7 @@ def set_block(interpreter, args, context) -> function_output:
 def raycast_block(interpreter, args, context) -> function_output:
     from .compile_interpreter import CompileContext
     local_context = CompileContext(parent=context)
-    raycast_id = generate_uuid()
+    raycast_id = context.generate_id()
     raycast_function: MCSFunction = args[0]  # get function to play on block (at raycast end)
     raycast_range: mcs_type = args[1]  # get raycast range
     raycast_loop_function: MCSFunction | None = args[2] if len(args) > 2 else None  # get function to play on each loop
@@ -119,7 +119,7 @@ def raycast_block(interpreter, args, context) -> function_output:
 def raycast_entity(interpreter, args, context) -> function_output:
     from .compile_interpreter import CompileContext
     local_context = CompileContext(parent=context)
-    raycast_id = generate_uuid()
+    raycast_id = context.generate_id()
     raycast_function: MCSFunction = args[0]
     raycast_range: mcs_type = args[1]  # get raycast range
     raycast_loop_function: MCSFunction | None = args[2] if len(args) > 2 else None  # get function to play on each loop
@@ -213,30 +213,10 @@ def concatenate(interpreter, args, context) -> function_output:
 
 
 def append(interpreter, args, context) -> function_output:
-    from .compile_interpreter import CompileContext
     list_arg: MCSList = args[0]
     value: mcs_type = args[1]
 
-    set_key_context = CompileContext(parent=context)
-
-    commands = (
-        # Add element to list
-        f"data modify storage mcs_{context.uuid} current set value " "{}",
-        f"data modify storage mcs_{context.uuid} current.index set from storage {list_arg.get_storage()} {list_arg.get_nbt()}.length",
-        f"function {interpreter.datapack_id}:{set_key_context.mcfunction_name} with storage mcs_{context.uuid} current",
-
-        # Increment list length
-        f"execute store result score .temp mcs_math run data get storage {list_arg.get_storage()} {list_arg.get_nbt()}.length",
-        f"scoreboard players set .1 mcs_math 1",
-        f"scoreboard players operation .temp mcs_math += .1 mcs_math",
-        f"execute store result storage {list_arg.get_storage()} {list_arg.get_nbt()}.length int 1 run scoreboard players get .temp mcs_math",
-        f"scoreboard players reset .1 mcs_math",
-    )
-
-    interpreter.add_command(
-        set_key_context.mcfunction_name,
-        f"$data modify storage {list_arg.get_storage()} {list_arg.get_nbt()}.$(index) set from storage {value.get_storage()} {value.get_nbt()}"
-    )
+    commands = append_to_list_cmds(list_arg.get_storage(), list_arg.get_nbt(), value)
 
     return commands, MCSNull(context)
 
@@ -246,17 +226,16 @@ def mcs_range(interpreter, args, context) -> function_output:
     range_bound: MCSNumber = args[0]
 
     result = MCSList(context)
-    scoreboard_id = f"{generate_uuid()}"
+    scoreboard_id = context.generate_id()
     recursive_function = CompileContext(parent=context)
-    set_index_function = CompileContext(parent=context)
 
     commands = (
         # Initialize values:
         f"scoreboard players set .range_current_{scoreboard_id} mcs_math 0",
         f"execute store result score .range_max_{scoreboard_id} mcs_math run data get storage {range_bound.get_storage()} {range_bound.get_nbt()}",
-        f"data modify storage {result.get_storage()} {result.get_nbt()}.length set from storage {range_bound.get_storage()} {range_bound.get_nbt()}",
+        f"data modify storage {result.get_storage()} {result.get_nbt()} set value []",
 
-        f"function {interpreter.datapack_id}:{recursive_function.mcfunction_name}",
+        f"execute if score .range_current_{scoreboard_id} mcs_math < .range_max_{scoreboard_id} mcs_math run function {interpreter.datapack_id}:{recursive_function.mcfunction_name}",
 
         # Clean up initial values:
         f"scoreboard players reset .range_current_{scoreboard_id} mcs_math",
@@ -264,25 +243,16 @@ def mcs_range(interpreter, args, context) -> function_output:
     )
 
     recursive_function_commands = (
-        # Initialize values for set_index_function:
-        f"data modify storage mcs_{recursive_function.uuid} current set value " "{}",
-        f"execute store result storage mcs_{recursive_function.uuid} current.index int 1 run scoreboard players get .range_current_{scoreboard_id} mcs_math",
-
-        f"function {interpreter.datapack_id}:{set_index_function.mcfunction_name} with storage mcs_{recursive_function.uuid} current",
+        # Append the current number (an element is added first, then overwritten by the score):
+        f"data modify storage {result.get_storage()} {result.get_nbt()} append value " "{v: 0}",
+        f"execute store result storage {result.get_storage()} {list_element_nbt(result.get_nbt(), -1)} int 1 run scoreboard players get .range_current_{scoreboard_id} mcs_math",
 
         # Recursive loop:
-        f"scoreboard players set .1 mcs_math 1",
-        f"scoreboard players operation .range_current_{scoreboard_id} mcs_math += .1 mcs_math",
-        f"scoreboard players reset .1 mcs_math",
-        f"execute unless score .range_current_{scoreboard_id} mcs_math >= .range_max_{scoreboard_id} mcs_math run function {interpreter.datapack_id}:{recursive_function.mcfunction_name}",
+        f"scoreboard players add .range_current_{scoreboard_id} mcs_math 1",
+        f"execute if score .range_current_{scoreboard_id} mcs_math < .range_max_{scoreboard_id} mcs_math run function {interpreter.datapack_id}:{recursive_function.mcfunction_name}",
     )
     interpreter.add_commands(recursive_function.mcfunction_name, recursive_function_commands)
 
-    interpreter.add_command(
-        set_index_function.mcfunction_name,
-        f"$data modify storage {result.get_storage()} {result.get_nbt()}.$(index) set value $(index)"
-    )
-
     return commands, result
 
 
@@ -0,0 +1,62 @@
+from hashlib import sha256
+
+BASE36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+NAMESPACE_HASH_LENGTH = 5  # base-36 digits used for stable namespace hashes
+
+
+def to_base36(number: int) -> str:
+    if number == 0:
+        return BASE36_DIGITS[0]
+
+    digits = []
+    while number > 0:
+        number, digit = divmod(number, 36)
+        digits.append(BASE36_DIGITS[digit])
+
+    return "".join(reversed(digits))
+
+
+def stable_hash(text: str) -> str:
+    number = int.from_bytes(sha256(text.encode("utf-8")).digest()[:8], "big") % 36 ** NAMESPACE_HASH_LENGTH
+    return to_base36(number).rjust(NAMESPACE_HASH_LENGTH, BASE36_DIGITS[0])
+
+
+class IdAllocator:
+    """
+    Deterministic, per-build id allocator.
+    Ids are short base-36 counters (valid in storage names, NBT paths,
+    score holders and function names).
+
+    If stable ids are enabled, every user function gets its own namespace
+    (a hash of its path in the AST), so that changes inside one function
+    don't rename anything in other functions.
+    """
+
+    def __init__(self, *, stable: bool = False, path: str = "", prefix: str = "", root: "IdAllocator" = None):
+        self.stable = stable
+        self.path = path
+        self.prefix = prefix
+        self.counter = 0
+        self.used_prefixes: set[str] = {prefix} if root is None else root.used_prefixes
+
+    def generate_id(self) -> str:
+        new_id = f"{self.prefix}{to_base36(self.counter)}"
+        self.counter += 1
+        return new_id
+
+    def scoped(self, name: str) -> "IdAllocator":
+        if not self.stable:
+            return self  # single counter for the whole build
+
+        path = f"{self.path}/{name}"
+        prefix = f"{stable_hash(path)}_"
+        collision_count = 0
+        while prefix in self.used_prefixes:  # very unlikely, but ids have to be unique
+            collision_count += 1
+            prefix = f"{stable_hash(f'{path}#{collision_count}')}_"
+
+        self.used_prefixes.add(prefix)
+        return IdAllocator(stable=True, path=path, prefix=prefix, root=self)
+
+    def __repr__(self) -> str:
+        return f"IdAllocator({self.prefix !r}, {self.counter !r})"
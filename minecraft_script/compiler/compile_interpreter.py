@@ -1,6 +1,28 @@
-from .builtin_functions import builtin_functions
+from .builtin_functions import builtin_functions, mcs_range
 from .compile_types import *
-from ..common import COMMON_CONFIG
+from .compile_ids import IdAllocator
+from ..common import COMMON_CONFIG, get_visit_method
+from ..parser.nodes import ParserNode, NumberNode, StringNode, BooleanNode, NullNode, BinaryOperationNode, \
+    UnaryOperationNode, FunctionCallNode, VariableAccessNode, VariableSetNode, CodeBlockNode
+from .dead_code import is_command
+from .inliner import has_control_flow
+from heapq import heappush, heappop
+
+# inline scoreboard operations for every binary operator (on two registers):
+score_operations = {
+    "add": "+=",
+    "subtract": "-=",
+    "multiply": "*=",
+    "divide": "/=",
+    "modulus": "%=",
+}
+score_comparisons = {
+    "equals": "=",
+    "less_than": "<",
+    "greater_than": ">",
+    "less_equals_than": "<=",
+    "greater_equals_than": ">=",
+}
 
 
 def add_comment(commands: tuple | list | str, comment: str) -> tuple | str:
@@ -40,23 +62,24 @@ class CompileSymbols:
             )
 
     def get(self, name: str, *, raise_error=True) -> mcs_type:
-        value = self.symbols.get(name, None)
-        if value is not None:
-            return value  # NOQA since value is not None but PyCharm seems to think it is
+        symbols = self
+        while symbols is not None:  # search in own symbols, then in parents
+            value = symbols.symbols.get(name, None)
+            if value is not None:
+                return value  # NOQA since value is not None but PyCharm seems to think it is
 
-        if self.parent is not None:
-            return self.parent.get(name)
+            symbols = symbols.parent
 
         raise NameError(f"name {name !r} is not defined")
 
     def set(self, name: str, value: mcs_type) -> None:
-        if self.symbols.get(name, None) is not None:
-            self.symbols[name] = value
-            return
+        symbols = self
+        while symbols is not None:
+            if symbols.symbols.get(name, None) is not None:
+                symbols.symbols[name] = value
+                return
 
-        if self.parent is not None:
-            self.parent.set(name, value)
-            return
+            symbols = symbols.parent
 
         raise NameError(f"name {name !r} has not been declared")
 
@@ -69,12 +92,19 @@ class CompileSymbols:
 
 
 class CompileContext:
-    def __init__(self, mcfunction_name: str = None, *, parent: "CompileContext" = None, top_level: bool = False):
+    def __init__(self, mcfunction_name: str = None, *, parent: "CompileContext" = None, top_level: bool = False,
+                 id_allocator: IdAllocator = None):
         self.parent: CompileContext = parent
+        if id_allocator is None:  # share ids with parent (contexts without parent are builtin placeholders)
+            id_allocator = parent.id_allocator if parent is not None else IdAllocator()
+        self.id_allocator = id_allocator
         self.symbols = CompileSymbols(parent.symbols if parent is not None else None, load_builtins=top_level)  # NOQA
         self.top_level = top_level
-        self._mcfunction_name = mcfunction_name if mcfunction_name is not None else f":cb_{generate_uuid()}"
-        self.uuid = generate_uuid()
+        self._mcfunction_name = mcfunction_name if mcfunction_name is not None else f":cb_{self.generate_id()}"
+        self.uuid = self.generate_id()
+
+    def generate_id(self) -> str:
+        return self.id_allocator.generate_id()
 
     @property
     def mcfunction_name(self) -> str:
@@ -118,6 +148,9 @@ class CompileCommands:
 
         self.commands[mcfunction] = [command]  # create list if it doesn't already exist
 
+    def pop_commands(self, mcfunction: str) -> list[str]:
+        return self.commands.pop(mcfunction, [])
+
     def get_file_content(self, mcfunction_file_name: str) -> str:
         return "\n".join(self.commands.get(mcfunction_file_name, []))
 
@@ -128,6 +161,87 @@ class CompileCommands:
         return "CompileCommands()"
 
 
+class ScoreRegisters:
+    """
+    Allocator for scoreboard registers (.r0, .r1, ...) holding intermediate
+    integer values, so that chained operations don't go through storage.
+    """
+
+    def __init__(self):
+        self.free_registers: list[int] = []  # heap, so that the lowest register is always reused first
+        self.register_count = 0
+
+    def allocate(self) -> str:
+        if self.free_registers:
+            return f".r{heappop(self.free_registers)}"
+
+        self.register_count += 1
+        return f".r{self.register_count - 1}"
+
+    def free(self, register: str) -> None:
+        heappush(self.free_registers, int(register[2:]))
+
+    def __repr__(self) -> str:
+        return f"ScoreRegisters({self.register_count !r})"
+
+
+def has_function_call(node) -> bool:
+    # function calls can run code that uses registers too
+    if isinstance(node, FunctionCallNode):
+        return True
+
+    if isinstance(node, ParserNode):
+        return any(has_function_call(getattr(node, slot)) for slot in type(node).__slots__)
+
+    if isinstance(node, (list, tuple)):
+        return any(has_function_call(item) for item in node)
+
+    if isinstance(node, dict):
+        return any(has_function_call(item) for item in node.values())
+
+    return False
+
+
+def sets_variable(node, name: str) -> bool:
+    if isinstance(node, VariableSetNode) and node.get_name() == name:
+        return True
+
+    if isinstance(node, ParserNode):
+        return any(sets_variable(getattr(node, slot), name) for slot in type(node).__slots__)
+
+    if isinstance(node, (list, tuple)):
+        return any(sets_variable(item, name) for item in node)
+
+    if isinstance(node, dict):
+        return any(sets_variable(item, name) for item in node.values())
+
+    return False
+
+
+def get_constant_values(nodes: list) -> list[str] | None:
+    # SNBT literals of a list's elements, if they are all constants
+    values = []
+
+    for node in nodes:
+        if isinstance(node, NumberNode):
+            values.append(str(int(node.get_value())))
+        elif isinstance(node, BooleanNode):
+            values.append("1" if node.get_value() is True else "0")
+        elif isinstance(node, StringNode):
+            values.append(repr(node.get_value()))
+        elif isinstance(node, NullNode):
+            values.append("0b")
+        else:
+            return None
+
+    return values
+
+
+def can_inline(commands: list[str]) -> bool:
+    lines = [line for command in commands for line in command.split("\n") if is_command(line)]
+    return len(lines) <= COMMON_CONFIG["inline_threshold"] and not any(map(has_control_flow, lines))
+
+
 class CompileResult:
     def __init__(self, value: mcs_type = None, return_value: mcs_type = None):
         self.value = value
@@ -144,12 +258,20 @@ class CompileResult:
 
 
 class CompileInterpreter:
+    dispatch_table: dict[type, callable] = {}  # node type -> visit method, filled once per class
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch_table = {}  # subclasses can override visit methods
+
     def __init__(self, datapack_id):
         self.datapack_id = datapack_id
         self.commands = CompileCommands()
         self.used_context_ids = set()
-        self.functions_to_generate = set()
+        self.functions_to_generate = []  # list to keep generation order (and thereby output) deterministic
         self.click_item_lookup = dict()  # table containing clickable item functions and their associated ids
+        self.registers = ScoreRegisters()
+        self.key_helpers: dict[tuple[str, str, str], str] = {}  # (list storage, list nbt, result storage) -> macro function
 
     def add_command(self, mcfunction: str, command: str | None) -> None:
         if command is not None:  # only add command if it's not nothing (makes it easier for dynamic commands)
@@ -166,11 +288,63 @@ class CompileInterpreter:
         return self.commands.get_mcs_functions()
 
     def visit(self, node, context: CompileContext) -> CompileResult:
+        result = self.visit_unspilled(node, context)
+
+        if isinstance(result.get_value(), MCSScore):  # value is only in a register, but has to be used from storage
+            return CompileResult(self.spill_score(result.get_value(), context), result.get_return())
+
+        return result
+
+    def visit_unspilled(self, node, context: CompileContext) -> CompileResult:
         if context.uuid not in self.used_context_ids:
             self.used_context_ids.add(context.uuid)
 
-        method = getattr(self, f"visit_{type(node).__name__}", self.visit_unknown)
-        return method(node, context)
+        method = self.dispatch_table.get(node.__class__)
+        if method is None:
+            method = self.dispatch_table[node.__class__] = get_visit_method(type(self), node.__class__)
+
+        return method(self, node, context)
+
+    # ------------------ score registers ------------------ :
+    def spill_score(self, score: MCSScore, context: CompileContext) -> mcs_type:
+        result = score.value_type(context)
+        self.add_command(
+            context.mcfunction_name,
+            f"execute store result storage {result.get_storage()} {result.get_nbt()} int 1 run scoreboard players get {score.get_score()}"
+        )
+        self.registers.free(score.register)
+
+        return result
+
+    def visit_score(self, node, context: CompileContext) -> MCSScore:
+        if isinstance(node, (BinaryOperationNode, UnaryOperationNode)):
+            return self.visit_unspilled(node, context).get_value()  # already in a register
+
+        if isinstance(node, NumberNode):  # constants don't need to go through storage
+            score = MCSScore(self.registers.allocate(), context)
+            self.add_command(context.mcfunction_name, f"scoreboard players set {score.get_score()} {int(node.get_value())}")
+            return score
+
+        return self.load_score(self.visit(node, context).get_value(), context)
+
+    def load_score(self, value: mcs_type, context: CompileContext) -> MCSScore:
+        if isinstance(value, MCSScore):
+            return value
+
+        score = MCSScore(self.registers.allocate(), context)
+        self.add_command(
+            context.mcfunction_name,
+            f"execute store result score {score.get_score()} run data get storage {value.get_storage()} {value.get_nbt()}"
+        )
+        return score
+
+    def score_to_out_cmd(self, value: mcs_type) -> str:
+        # load a condition value into the .out score
+        if isinstance(value, MCSScore):
+            self.registers.free(value.register)
+            return f"scoreboard players operation .out mcs_math = {value.get_score()}"
+
+        return f"execute store result score .out mcs_math run data get storage {value.get_storage()} {value.get_nbt()} 1"
 
     # ------------------ value nodes ------------------ :
     def visit_NumberNode(self, node, context: CompileContext) -> CompileResult:
@@ -194,6 +368,12 @@ class CompileInterpreter:
         return result
 
     def visit_ListNode(self, node, context: CompileContext) -> CompileResult:
+        constant_values = get_constant_values(node.get_node_list())
+        if constant_values is not None:  # whole list in a single command
+            mcs_obj = MCSList(context)
+            self.add_command(context.mcfunction_name, mcs_obj.save_constants_cmd(constant_values))
+            return CompileResult(mcs_obj)
+
         value_list: list[mcs_type] = list(map(lambda x: self.visit(x, context).get_value(), node.get_node_list()))
         mcs_obj = MCSList(context)
 
@@ -226,7 +406,7 @@ class CompileInterpreter:
         fnc_parameter_names: list[str, ...] = node.get_parameter_names()
 
         function = MCSFunction(fnc_name, fnc_body, fnc_parameter_names, context)
-        self.functions_to_generate.add(function)  # save function to generate for later
+        self.functions_to_generate.append(function)  # save function to generate for later
         context.declare(fnc_name, function)
 
         return CompileResult(function)
@@ -274,26 +454,47 @@ class CompileInterpreter:
 
     def visit_GetKeyNode(self, node, context: CompileContext) -> CompileResult:
         atom: mcs_type = self.visit(node.get_atom(), context).get_value()
-        key: MCSNumber = self.visit(node.get_key(), context).get_value()
-
+        key_node = node.get_key()
         result = MCSUnknown(context)
 
-        local_context = CompileContext(parent=context)  # context for function that retrieves value at index
-        self.add_command(
-            local_context.mcfunction_name,
-            f"$data modify storage {result.get_storage()} {result.get_nbt()} set from storage {atom.get_storage()} {atom.get_nbt()}.$(index)"
-        )
+        if isinstance(key_node, NumberNode):  # constant index (negative ones count from the end), no macro needed
+            command = f"data modify storage {result.get_storage()} {result.get_nbt()} set from storage {atom.get_storage()} {list_element_nbt(atom.get_nbt(), int(key_node.get_value()))}"
+            self.add_command(context.mcfunction_name, add_comment(command, f"Get key (from {atom.get_nbt() !r})"))
+            return CompileResult(result)
+
+        key: MCSNumber = self.visit(key_node, context).get_value()
+        if isinstance(key, MCSLoopCounter) and key.context is context:  # this function already gets the index as argument
+            command = f"$data modify storage {result.get_storage()} {result.get_nbt()} set from storage {atom.get_storage()} {list_element_nbt(atom.get_nbt(), f'$({key.name})')}"
+            self.add_command(context.mcfunction_name, add_comment(command, f"Get key (from {atom.get_nbt() !r})"))
+            return CompileResult(result)
 
         commands = (
-            f"data modify storage mcs_{context.uuid} current set value " "{}",
+            f"data modify storage mcs_{context.uuid} current set value " "{result: " f"{result.get_nbt() !r}" "}",
             f"data modify storage mcs_{context.uuid} current.index set from storage {key.get_storage()} {key.get_nbt()}",
-            f"function {self.datapack_id}:{local_context.mcfunction_name} with storage mcs_{context.uuid} current"
+            f"function {self.datapack_id}:{self.get_key_helper(atom, result)} with storage mcs_{context.uuid} current"
         )
         commands = add_comment(commands, f"Get key (from {atom.get_nbt() !r})")
         self.add_commands(context.mcfunction_name, commands)
 
         return CompileResult(result)
 
+    def get_key_helper(self, atom: mcs_type, result: MCSObject) -> str:
+        # one macro function per list, shared by every access that stores its result in the same storage
+        helper_key = (atom.get_storage(), atom.get_nbt(), result.get_storage())
+        helper_name = self.key_helpers.get(helper_key)
+        if helper_name is not None:
+            return helper_name
+
+        helper_context = CompileContext(parent=result.context)
+        self.used_context_ids.add(helper_context.uuid)  # nothing is visited in helper context
+        self.add_command(
+            helper_context.mcfunction_name,
+            f"$data modify storage {result.get_storage()} $(result) set from storage {atom.get_storage()} {list_element_nbt(atom.get_nbt(), '$(index)')}"
+        )
+
+        helper_name = self.key_helpers[helper_key] = helper_context.mcfunction_name
+        return helper_name
+
     # ------------------ conditions & loops ------------------ :
     def visit_IfConditionNode(self, node, context: CompileContext) -> CompileResult:
         conditions: list[dict] = node.get_conditions()
@@ -306,7 +507,7 @@ class CompileInterpreter:
         self.add_commands(context.mcfunction_name, init_commands)
 
         for condition in conditions:
-            # create local context with all parent variables and create all body commands there
+            # create local context and create all body commands there (variables are read from the storage that owns them)
             sublocal_context = CompileContext(parent=local_context)
             out: CompileResult = self.visit(condition.get('body'), sublocal_context)
 
@@ -314,7 +515,6 @@ class CompileInterpreter:
                 expression: MCSNumber = self.visit(condition.get('expression'), context).get_value()
                 commands = (
                     f"execute store result score .out mcs_math run data get storage {expression.get_storage()} {expression.get_nbt()} 1",
-                    f"data modify storage mcs_{sublocal_context.uuid} variable set from storage mcs_{context.uuid} variable",
                     f"execute if score .out mcs_math matches 1 run function {self.datapack_id}:{sublocal_context.mcfunction_name}",
                     f"execute if score .out mcs_math matches 1 run return 0",
                 )
@@ -334,49 +534,104 @@ class CompileInterpreter:
         return CompileResult()
 
     def visit_ForLoopNode(self, node, context: CompileContext) -> CompileResult:
+        if self.is_range_call(node.get_iterable(), context):
+            return self.visit_range_loop(node, context)
+
         iterable: MCSList = self.visit(node.get_iterable(), context).get_value()
         element_name: str = node.get_child_name()
         body = node.get_body()
 
         local_context = CompileContext(parent=context)
-        macro_context = CompileContext(parent=context)
-        self.used_context_ids.add(macro_context)  # nothing is visited in macro context, and variables are copied over
-        loop_id = f"{generate_uuid()}"
+        remaining = MCSList(local_context)  # copy of the list, its first element is removed every iteration
 
         init_commands = (
-            f"scoreboard players set .loop_iter_{loop_id} mcs_math 0",
-            f"execute store result score .loop_end_{loop_id} mcs_math run data get storage {iterable.get_storage()} {iterable.get_nbt()}.length 1",
-            f"function {self.datapack_id}:{local_context.mcfunction_name}",
-            # remove scoreboard values to avoid clutter:
-            f"scoreboard players reset .loop_iter_{loop_id} mcs_math",
-            f"scoreboard players reset .loop_end_{loop_id} mcs_math",
+            f"data modify storage {remaining.get_storage()} {remaining.get_nbt()} set from storage {iterable.get_storage()} {iterable.get_nbt()}",
+            f"execute if data storage {remaining.get_storage()} {remaining.get_nbt()}[0] run function {self.datapack_id}:{local_context.mcfunction_name}",
+            remaining.delete_from_storage_cmd(),
         )
         init_commands = add_comment(init_commands, f"For loop (variable {element_name !r})")
         self.add_commands(context.mcfunction_name, init_commands)
 
-        macro_cmd = f"$data modify storage mcs_{local_context.uuid} variable.{element_name} set from storage {iterable.get_storage()} {iterable.get_nbt()}.$(index)"
-        self.add_command(macro_context.mcfunction_name, macro_cmd)
-
         loop_init_commands = (
-            f"execute store result storage mcs_{local_context.uuid} current.index int 1 run scoreboard players get .loop_iter_{loop_id} mcs_math",
-            f"function {self.datapack_id}:{macro_context.mcfunction_name} with storage mcs_{local_context.uuid} current",
+            f"data modify storage mcs_{local_context.uuid} variable.{element_name} set from storage {remaining.get_storage()} {list_element_nbt(remaining.get_nbt(), 0)}",
+            f"data remove storage {remaining.get_storage()} {remaining.get_nbt()}[0]",
         )
         self.add_commands(local_context.mcfunction_name, loop_init_commands)
         local_context.declare(element_name, MCSVariable(element_name, local_context))
 
         out: CompileResult = self.visit(body, local_context)  # add commands to code block
 
-        loop_end_commands = (
-            f"scoreboard players add .loop_iter_{loop_id} mcs_math 1",
-            f"execute if score .loop_iter_{loop_id} mcs_math < .loop_end_{loop_id} mcs_math run function {self.datapack_id}:{local_context.mcfunction_name}",
-        )
-        self.add_commands(local_context.mcfunction_name, loop_end_commands)
+        loop_end_cmd = f"execute if data storage {remaining.get_storage()} {remaining.get_nbt()}[0] run function {self.datapack_id}:{local_context.mcfunction_name}"
+        self.add_command(local_context.mcfunction_name, loop_end_cmd)
 
         if out.get_return() is not None:
             return out
 
         return CompileResult()
 
+    @staticmethod
+    def is_range_call(node, context: CompileContext) -> bool:
+        # only variable roots can be checked without compiling the call
+        if not isinstance(node, FunctionCallNode) or not isinstance(node.get_root(), VariableAccessNode):
+            return False
+
+        function = context.get(node.get_root().get_name())
+        return getattr(function, "call", None) is mcs_range and len(node.get_arguments()) == 1
+
+    def visit_range_loop(self, node, context: CompileContext) -> CompileResult:
+        """
+        for loop over range(...), counting with a score instead of
+        building the list first and reading every element back from it
+        """
+        element_name: str = node.get_child_name()
+        body = node.get_body()
+        local_context = CompileContext(parent=context)
+        loop_id = context.generate_id()
+
+        # the bound can't stay in a register, since the loop body may use them too:
+        bound = self.visit_score(node.get_iterable().get_arguments()[0], context)
+        self.registers.free(bound.register)
+
+        # unless the body changes it, the loop variable is passed to the loop function as macro argument:
+        is_counter = not sets_variable(body, element_name)
+        element = (MCSLoopCounter if is_counter else MCSVariable)(element_name, local_context)
+        local_context.declare(element_name, element)
+
+        if isinstance(body, CodeBlockNode):  # the loop context is already a scope of its own
+            body = body.get_body()
+        out: CompileResult = self.visit(body, local_context)  # add commands to code block
+
+        # only macro functions can be called with arguments:
+        loop_lines = "\n".join(self.commands.commands.get(local_context.mcfunction_name, ())).split("\n")
+        is_macro = is_counter and any(line.startswith("$") for line in loop_lines)
+        loop_cmd = (
+            f"execute if score .loop_iter_{loop_id} mcs_math < .loop_end_{loop_id} mcs_math run "
+            f"function {self.datapack_id}:{local_context.mcfunction_name}"
+            + (f" with storage {element.get_storage()} variable" if is_macro else "")
+        )
+        store_cmd = f"execute store result storage {element.get_storage()} {element.get_nbt()} int 1 run scoreboard players get .loop_iter_{loop_id} mcs_math"
+
+        init_commands = (
+            f"scoreboard players set .loop_iter_{loop_id} mcs_math 0",
+            f"scoreboard players operation .loop_end_{loop_id} mcs_math = {bound.get_score()}",
+            store_cmd,
+            loop_cmd,
+            # remove scoreboard values to avoid clutter:
+            f"scoreboard players reset .loop_iter_{loop_id} mcs_math",
+            f"scoreboard players reset .loop_end_{loop_id} mcs_math",
+        )
+        init_commands = add_comment(init_commands, f"For loop over range (variable {element_name !r})")
+        self.add_commands(context.mcfunction_name, init_commands)
+
+        loop_end_commands = (
+            f"scoreboard players add .loop_iter_{loop_id} mcs_math 1",
+            store_cmd,  # before the call, so that the next iteration gets the new value as argument
+            loop_cmd,
+        )
+        self.add_commands(local_context.mcfunction_name, loop_end_commands)
+
+        return out if out.get_return() is not None else CompileResult()
+
     def visit_WhileLoopNode(self, node, context: CompileContext) -> CompileResult:
         loop_context = CompileContext(parent=context)
 
@@ -388,10 +643,10 @@ class CompileInterpreter:
 
         # Add while loop body inside local context:
         out: CompileResult = self.visit(node.get_body(), loop_context)
-        condition: mcs_type = self.visit(node.get_condition(), loop_context).get_value()
+        condition: mcs_type = self.visit_unspilled(node.get_condition(), loop_context).get_value()
 
         loop_commands = (
-            f"execute store result score .out mcs_math run data get storage {condition.get_storage()} {condition.get_nbt()} 1",
+            self.score_to_out_cmd(condition),
             f"execute if score .out mcs_math matches 1 run function {self.datapack_id}:{loop_context.mcfunction_name}",
         )
         loop_commands = add_comment(loop_commands, f"While loop:")
@@ -404,10 +659,10 @@ class CompileInterpreter:
         schedule_context = CompileContext(parent=context)
         selector_context = CompileContext(parent=context)
         condition_context = CompileContext(parent=context)
-        selector_id = generate_uuid()
+        selector_id = f"mcs_async_{context.generate_id()}"  # prefixed, short ids could clash with user tags
 
         out: CompileResult = self.visit(node.get_body(), loop_context)
-        condition: mcs_type = self.visit(node.get_condition(), condition_context).get_value()
+        condition: mcs_type = self.visit_unspilled(node.get_condition(), condition_context).get_value()
 
         # Initialize loop:
         loop_init_cmd = f"function {self.datapack_id}:{condition_context.mcfunction_name}"
@@ -416,7 +671,7 @@ class CompileInterpreter:
 
         # Check condition; if true, run while loop iteration
         condition_commands = (
-            f"execute store result score .out mcs_math run data get storage {condition.get_storage()} {condition.get_nbt()} 1",
+            self.score_to_out_cmd(condition),
             f"execute if score .out mcs_math matches 1 run function {self.datapack_id}:{loop_context.mcfunction_name}",
         )
         loop_condition_commands = add_comment(condition_commands, f"Async While Loop (condition segment - {context.mcfunction_name !r}):")
@@ -462,10 +717,19 @@ class CompileInterpreter:
         local_context = CompileContext(parent=context)
         return_value: CompileResult = self.visit(node.get_body(), local_context)
 
-        # import parent context's variables and execute code block:
+        block_commands = self.commands.pop_commands(local_context.mcfunction_name)
+        if can_inline(block_commands):
+            for command in block_commands:
+                self.add_command(context.mcfunction_name, command)
+            return return_value
+
+        for command in block_commands:  # too big, keep block in its own function
+            self.add_command(local_context.mcfunction_name, command)
+
+        # variables are resolved to the storage of the context that owns them at compile time,
+        # so the block doesn't need the parent's variables to be copied over:
         commands = (
-            f"data modify storage mcs_{local_context.uuid} variable set from storage mcs_{context.uuid} variable",
-            f"function {self.datapack_id}:{local_context.mcfunction_name}"
+            f"function {self.datapack_id}:{local_context.mcfunction_name}",
         )
         commands = add_comment(commands, f"Code block (parent: {context.mcfunction_name !r})")
         self.add_commands(context.mcfunction_name, commands)  # add commands to parent context
@@ -492,7 +756,6 @@ class CompileInterpreter:
         out: CompileResult = self.visit(node.get_statement(), local_context)  # add commands to local context
 
         setup_commands = (
-            f"data modify storage mcs_{local_context.uuid} variable set from storage mcs_{context.uuid} variable",
             f"execute as @{selector} at @s run function {self.datapack_id}:{local_context.mcfunction_name}",  # NOQA
         )
         commands = add_comment(setup_commands, f"Entity selector {selector !r}")
@@ -502,37 +765,77 @@ class CompileInterpreter:
 
     # ------------------ Operations ------------------ :
     def visit_BinaryOperationNode(self, node, context: CompileContext) -> CompileResult:
-        left_value: mcs_type = self.visit(node.get_left_node(), context).get_value()
-        right_value: mcs_type = self.visit(node.get_right_node(), context).get_value()
         operation: str = node.get_operator().variant.lower()  # 'add', 'subtract', etc...
-        result: mcs_type = MCSNumber(context)
+        right_node = node.get_right_node()
+
+        if has_function_call(right_node):  # no register can be in use while a function runs
+            left_value: mcs_type = self.visit(node.get_left_node(), context).get_value()
+            right_score = self.visit_score(right_node, context)
+            left_score = self.load_score(left_value, context)
+        else:
+            left_score = self.visit_score(node.get_left_node(), context)
+            right_score = None if self.is_constant_step(operation, right_node) else self.visit_score(right_node, context)
+
+        left, right = left_score.get_score(), right_score.get_score() if right_score is not None else None
+        value_type = MCSNumber
+
+        if right_score is None:  # adding or subtracting a constant
+            amount = int(right_node.get_value())
+            commands = (f"scoreboard players {'add' if operation == 'add' else 'remove'} {left} {amount}",)
+        elif operation in score_operations:
+            commands = (f"scoreboard players operation {left} {score_operations[operation]} {right}",)
+        elif operation in score_comparisons:
+            commands = (f"execute store success score {left} if score {left} {score_comparisons[operation]} {right}",)
+            value_type = MCSBoolean
+        elif operation == "boolean_and":
+            commands = (f"execute store success score {left} unless score {left} matches 0 unless score {right} matches 0",)
+            value_type = MCSBoolean
+        elif operation == "boolean_or":
+            commands = (
+                f"execute if score {left} matches 0 run scoreboard players operation {left} = {right}",
+                f"execute store success score {left} unless score {left} matches 0",
+            )
+            value_type = MCSBoolean
+        else:
+            raise ValueError(f"Unknown binary operation {operation !r}")
+
+        if right_score is not None:
+            self.registers.free(right_score.register)
 
-        commands = (
-            f"execute store result score .a mcs_math run data get storage {left_value.get_storage()} {left_value.get_nbt()}",
-            f"execute store result score .b mcs_math run data get storage {right_value.get_storage()} {right_value.get_nbt()}",
-            f"function {self.datapack_id}:math/{operation}",
-            f"execute store result storage mcs_{context.uuid} {result.get_nbt()} int 1 run scoreboard players get .out mcs_math",
-        )
         commands = add_comment(commands, f"Binary Operation {operation !r}")
         self.add_commands(context.mcfunction_name, commands)
 
-        return CompileResult(result)
-
-    def visit_UnaryOperationNode(self, node, context: CompileContext) -> CompileResult:
-        operation = f"u_{node.get_operator()}"
-        root: mcs_type = self.visit(node.get_root(), context).get_value()
+        return CompileResult(MCSScore(left_score.register, context, value_type))
 
-        result = MCSBoolean(context)
+    @staticmethod
+    def is_constant_step(operation: str, node) -> bool:
+        # "scoreboard players add/remove" only take non-negative amounts
+        return operation in ("add", "subtract") and isinstance(node, NumberNode) and int(node.get_value()) >= 0
 
-        commands = (
-            f"execute store result score .a mcs_math run data get storage {root.get_storage()} {root.get_nbt()}",
-            f"function {self.datapack_id}:math/{operation}",
-            f"execute store result storage {result.get_storage()} {result.get_nbt()} int 1 run scoreboard players get .out mcs_math",
-        )
-        commands = add_comment(commands, f"Unary Operation {operation !r}")
-        self.add_commands(context.mcfunction_name, commands)
+    def visit_UnaryOperationNode(self, node, context: CompileContext) -> CompileResult:
+        operation = node.get_operator()
+        root = self.visit_score(node.get_root(), context)
+        score = root.get_score()
+
+        if operation == "add":
+            commands = ()
+        elif operation == "subtract":
+            temp = self.registers.allocate()
+            commands = (
+                f"scoreboard players set {temp} mcs_math -1",
+                f"scoreboard players operation {score} *= {temp} mcs_math",
+            )
+            self.registers.free(temp)
+        elif operation == "not":
+            commands = (f"execute store success score {score} if score {score} matches 0",)
+        else:
+            raise ValueError(f"Unknown unary operation {operation !r}")
+
+        if commands:
+            commands = add_comment(commands, f"Unary Operation {f'u_{operation}' !r}")
+            self.add_commands(context.mcfunction_name, commands)
 
-        return CompileResult(result)
+        return CompileResult(MCSScore(root.register, context, MCSBoolean if operation == "not" else MCSNumber))
 
     # ------------------ miscellaneous ------------------ :
     @staticmethod
@@ -543,8 +846,8 @@ class CompileInterpreter:
         return "CompileInterpreter()"
 
 
-def mcs_compile(ast, functions_dir: str, datapack_id):
-    context = CompileContext('init', top_level=True)
+def mcs_compile(ast, datapack_id) -> dict[str, str]:
+    context = CompileContext('init', top_level=True, id_allocator=IdAllocator(stable=COMMON_CONFIG["stable_ids"]))
     interpreter = CompileInterpreter(datapack_id)
 
     interpreter.visit(ast, context)  # compile whole program to have a list of commands for each function
@@ -552,7 +855,7 @@ def mcs_compile(ast, functions_dir: str, datapack_id):
     for mcs_fnc in interpreter.functions_to_generate:
         mcs_fnc.generate_function(interpreter)  # generate user-defined functions (not done when compiling over program)
 
-    for context_id in interpreter.used_context_ids:  # remove all used storages in user_functions/kill.mcfunction
+    for context_id in sorted(interpreter.used_context_ids):  # remove all used storages in user_functions/kill.mcfunction
         commands = (
             f"data remove storage mcs_{context_id} current",
             f"data remove storage mcs_{context_id} variable",
@@ -561,12 +864,10 @@ def mcs_compile(ast, functions_dir: str, datapack_id):
             f"data remove storage mcs_{context_id} list",
             f"data remove storage mcs_{context_id} boolean",
             f"data remove storage mcs_{context_id} unknown",
+            f"data remove storage mcs_{context_id} temp",
             ""  # add newline to separate contexts (only visual)
         )
         interpreter.add_commands('user_functions/kill', commands)  # specify full path since not a context
 
-    for fnc_name in interpreter.get_mcs_functions():  # create the files for all functions
-        mcfunction_path = f"{functions_dir}/{fnc_name}.mcfunction"
-
-        with open(mcfunction_path, "xt") as mcfunction_file:
-            mcfunction_file.write(interpreter.get_file_content(fnc_name))
+    # content of all mcfunction files (keys are function paths, relative to the functions folder)
+    return {fnc_name: interpreter.get_file_content(fnc_name) for fnc_name in interpreter.get_mcs_functions()}
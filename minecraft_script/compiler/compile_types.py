@@ -1,10 +1,7 @@
-from ..common import generate_uuid
-
-
 class MCSObject:
     def __init__(self, context, storage_compartment: str):
         self.context = context
-        self.uuid = generate_uuid()
+        self.uuid = context.generate_id()
         self.storage_compartment = storage_compartment
 
     def get_nbt(self) -> str:
@@ -41,24 +38,48 @@ class MCSVariable:
         return f"MCSVariable({self.name !r}, {self.context.uuid !r})"
 
 
+class MCSLoopCounter(MCSVariable):
+    """
+    Variable of a for loop over range(...) that the loop body never sets,
+    so its function can also read it as the macro argument $(name).
+    """
+
+    def __repr__(self) -> str:
+        return f"MCSLoopCounter({self.name !r}, {self.context.uuid !r})"
+
+
+def list_element_nbt(list_nbt: str, index: int | str) -> str:
+    # elements are wrapped in compounds ({v: value}), since NBT lists can't mix types
+    return f"{list_nbt}[{index}].v"
+
+
+def append_to_list_cmds(list_storage: str, list_nbt: str, value: "mcs_type") -> tuple[str, ...]:
+    if isinstance(value, MCSNull):  # null values are never saved to storage
+        return f"data modify storage {list_storage} {list_nbt} append value " "{v: 0b}",
+
+    return (
+        f"data modify storage {list_storage} {list_nbt} append value " "{}",
+        f"data modify storage {list_storage} {list_element_nbt(list_nbt, -1)} set from storage {value.get_storage()} {value.get_nbt()}",  # NOQA
+    )
+
+
 class MCSList(MCSObject):
     def __init__(self, context):
         super().__init__(context, "list")
 
     def save_to_storage_cmd(self, values: list["mcs_type"]) -> list[str]:
-        commands = [
-            # add length (since value is (for now) set in stone)
-            f"data modify storage {self.get_storage()} {self.get_nbt()}.length set value {len(values)}"
-        ]
+        commands = [f"data modify storage {self.get_storage()} {self.get_nbt()} set value []"]
 
-        for i, value in enumerate(values):
-            commands.extend((
-                value.set_to_current_cmd(self.context),
-                f"data modify storage {self.get_storage()} {self.get_nbt()}.{i} set from storage {self.get_storage()} current"  # NOQA
-            ))
+        for value in values:
+            commands.extend(append_to_list_cmds(self.get_storage(), self.get_nbt(), value))
 
         return commands
 
+    def save_constants_cmd(self, values: list[str]) -> str:
+        # values are SNBT literals
+        elements = ", ".join("{v: " f"{value}" "}" for value in values)
+        return f"data modify storage {self.get_storage()} {self.get_nbt()} set value [{elements}]"
+
     def __repr__(self) -> str:
         return f"MCSList({self.uuid})"
 
@@ -109,6 +130,19 @@ class MCSUnknown(MCSObject):
         return f"MCSUnknown({self.uuid !r})"
 
 
+class MCSScore:
+    def __init__(self, register: str, context, value_type: type = MCSNumber):
+        self.register = register  # score holder in the mcs_math objective
+        self.context = context
+        self.value_type = value_type  # type of the value once it is moved to storage
+
+    def get_score(self) -> str:
+        return f"{self.register} mcs_math"
+
+    def __repr__(self) -> str:
+        return f"MCSScore({self.register !r}, {self.value_type.__name__ !r})"
+
+
 class MCSFunction:
     def __init__(self, name: str, body, parameter_names: list[str, ...], context):
         from .compile_interpreter import CompileContext
@@ -116,7 +150,12 @@ class MCSFunction:
         self.name = name
         self.body = body
         self.parameter_names = parameter_names
-        self.local_context = CompileContext(self.name, parent=context)
+        self.local_context = CompileContext(
+            self.name,
+            parent=context,
+            # own id namespace if stable ids are enabled (ids don't shift when other functions change)
+            id_allocator=context.id_allocator.scoped(self.name) if context is not None else None
+        )
 
     def generate_function(self, interpreter) -> None:
         for name in self.parameter_names:
@@ -141,4 +180,4 @@ class MCSFunction:
         return f"MCSFunction({self.name !r})"
 
 
-mcs_type = MCSNull | MCSNumber | MCSString | MCSBoolean | MCSUnknown | MCSList | MCSFunction | MCSVariable
+mcs_type = MCSNull | MCSNumber | MCSString | MCSBoolean | MCSUnknown | MCSList | MCSFunction | MCSVariable | MCSScore
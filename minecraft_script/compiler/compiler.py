@@ -1,20 +1,47 @@
 from .compile_interpreter import mcs_compile
-from ..common import module_folder, COMMON_CONFIG
+from .optimizer import optimize_ast
+from .dead_code import eliminate_dead_code
+from .inliner import inline_function_calls
+from .temporaries import reuse_temporary_slots
+from ..common import module_folder, COMMON_CONFIG, version
 from ..text_additions import text_error
-from os import mkdir, listdir
+from os import listdir, makedirs, remove, rmdir
+from os.path import dirname, isdir, isfile
+from hashlib import sha256
 from time import time
-from shutil import copyfile
+import json
+
+MANIFEST_FILE_NAME = ".mcs_manifest.json"
 
 
 class Compiler:
-    def __init__(self, ast: list, datapack_name: str, output_path: str, verbose: bool):
+    def __init__(self, ast: list, datapack_name: str, output_path: str, verbose: bool, *,
+                 incremental: bool = False, source_hash: str = None):
         self.ast = ast
         self.datapack_name = datapack_name
         self.datapack_id = datapack_name.lower().replace(' ', '_')
         self.output_path = output_path
         self.verbose = verbose
+        self.incremental = incremental
 
         self.root_folder = f"{self.output_path}/{self.datapack_name}"
+        self.output_files: dict[str, str | bytes] = {}  # file content for each path (relative to root folder)
+
+        # hash of everything the output depends on (None if unknown, in which case the program is always compiled)
+        self.build_hash = None if source_hash is None else sha256(
+            f"{version}:{COMMON_CONFIG['pack_format']}:{COMMON_CONFIG['debug_comments']}:"
+            f"{COMMON_CONFIG['stable_ids']}:{COMMON_CONFIG['dead_code_elimination']}:"
+            f"{COMMON_CONFIG['public_user_functions']}:{COMMON_CONFIG['inline_threshold']}:"
+            f"{COMMON_CONFIG['reuse_temporaries']}:"
+            f"{self.datapack_name}:{source_hash}".encode()
+        ).hexdigest()
+
+    def add_file(self, path: str, content: str | bytes) -> None:
+        self.output_files[path] = content
+
+    def add_template_file(self, template_path: str, path: str) -> None:
+        with open(f'{module_folder}/compiler/build_templates/{template_path}', 'rb') as template_file:
+            self.add_file(path, template_file.read())
 
     def make_init_file(self):
         text = (
@@ -30,8 +57,7 @@ class Compiler:
             f"function {self.datapack_id}:user_functions/init\n"  # call user-defined init
         )
 
-        with open(f'{self.root_folder}/data/{self.datapack_id}/functions/init.mcfunction', 'xt') as init_file:
-            init_file.write(text)
+        self.add_file(f'data/{self.datapack_id}/functions/init.mcfunction', text)
 
     def make_main_file(self):
         text = (
@@ -46,8 +72,7 @@ class Compiler:
             f"function {self.datapack_id}:user_functions/main\n"  # call user-defined main
         )
 
-        with open(f'{self.root_folder}/data/{self.datapack_id}/functions/main.mcfunction', 'xt') as main_file:
-            main_file.write(text)
+        self.add_file(f'data/{self.datapack_id}/functions/main.mcfunction', text)
 
     def make_kill_file(self):
         text = (
@@ -66,8 +91,7 @@ class Compiler:
             f"datapack disable \"file/{self.datapack_name}\"\n"
         )
 
-        with open(f'{self.root_folder}/data/{self.datapack_id}/functions/kill.mcfunction', 'xt') as kill_file:
-            kill_file.write(text)
+        self.add_file(f'data/{self.datapack_id}/functions/kill.mcfunction', text)
 
     def make_click_item_check_file(self):
         check_text = (
@@ -77,45 +101,23 @@ class Compiler:
             f"function {self.datapack_id}:clickable_items/run with storage mcs_click\n"
         )
 
-        click_path = f'{self.root_folder}/data/{self.datapack_id}/functions/clickable_items'
-        mkdir(click_path)  # create clickable_items directory
-
-        with open(f'{click_path}/check.mcfunction', 'xt') as check_file:
-            check_file.write(check_text)
-
-        with open(f'{click_path}/run.mcfunction', 'xt') as run_file:
-            run_file.write(f"$function {self.datapack_id}:clickable_items/$(id)\n")
+        click_path = f'data/{self.datapack_id}/functions/clickable_items'
 
-    def import_math_files(self):
-        mkdir(f'{self.root_folder}/data/{self.datapack_id}/functions/math')
-        for filename in listdir(f'{module_folder}/compiler/build_templates/math'):
-            copyfile(
-                f'{module_folder}/compiler/build_templates/math/{filename}',
-                f'{self.root_folder}/data/{self.datapack_id}/functions/math/{filename}'
-            )
+        self.add_file(f'{click_path}/check.mcfunction', check_text)
+        self.add_file(f'{click_path}/run.mcfunction', f"$function {self.datapack_id}:clickable_items/$(id)\n")
 
     def import_builtins_files(self):
-        mkdir(f'{self.root_folder}/data/{self.datapack_id}/functions/builtins')
         for filename in listdir(f'{module_folder}/compiler/build_templates/builtins'):
-            copyfile(
-                f'{module_folder}/compiler/build_templates/builtins/{filename}',
-                f'{self.root_folder}/data/{self.datapack_id}/functions/builtins/{filename}'
-            )
+            self.add_template_file(f'builtins/{filename}', f'data/{self.datapack_id}/functions/builtins/{filename}')
 
     def import_tags_folder(self):
         module_tags_folder = f'{module_folder}/compiler/build_templates/tags'
-        datapack_tags_folder = f'{self.root_folder}/data/{self.datapack_id}/tags'
 
-        mkdir(datapack_tags_folder)
         for directory_name in listdir(module_tags_folder):
-            current_module_folder = f'{module_tags_folder}/{directory_name}'
-            current_datapack_folder = f'{datapack_tags_folder}/{directory_name}'
-
-            mkdir(current_datapack_folder)
-            for file_name in listdir(current_module_folder):
-                copyfile(
-                    f'{current_module_folder}/{file_name}',
-                    f'{current_datapack_folder}/{file_name}'
+            for file_name in listdir(f'{module_tags_folder}/{directory_name}'):
+                self.add_template_file(
+                    f'tags/{directory_name}/{file_name}',
+                    f'data/{self.datapack_id}/tags/{directory_name}/{file_name}'
                 )
 
     def generate_builtin_functions(self):
@@ -124,82 +126,142 @@ class Compiler:
 
         self.make_init_file()
         if self.verbose:
-            print('\rBuilding built-in functions... 17%', end="")
+            print('\rBuilding built-in functions... 20%', end="")
 
         self.make_main_file()
         if self.verbose:
-            print('\rBuilding built-in functions... 33%', end="")
+            print('\rBuilding built-in functions... 40%', end="")
 
         self.make_kill_file()
         if self.verbose:
-            print('\rBuilding built-in functions... 50%', end="")
-
-        self.import_math_files()
-        if self.verbose:
-            print('\rBuilding built-in functions... 67%', end="")
+            print('\rBuilding built-in functions... 60%', end="")
 
         self.import_builtins_files()
         if self.verbose:
-            print('\rBuilding built-in functions... 83%', end="")
+            print('\rBuilding built-in functions... 80%', end="")
 
         self.make_click_item_check_file()
         if self.verbose:
             print('\rBuilding builtin-in functions... Done!')
 
+    # ---------------- Output files ---------------- :
+    def load_manifest(self) -> dict | None:
+        try:
+            with open(f'{self.root_folder}/{MANIFEST_FILE_NAME}', 'rt', encoding='utf-8') as manifest_file:
+                return json.loads(manifest_file.read())
+        except (OSError, ValueError):  # no previous build (or unreadable manifest)
+            return None
+
+    def save_manifest(self, file_hashes: dict[str, str]) -> None:
+        manifest = {
+            "version": version,
+            "build_hash": self.build_hash,
+            "files": file_hashes,
+        }
+
+        with open(f'{self.root_folder}/{MANIFEST_FILE_NAME}', 'wt', encoding='utf-8') as manifest_file:
+            manifest_file.write(json.dumps(manifest, indent=1, sort_keys=True))
+
+    def is_up_to_date(self, manifest: dict | None) -> bool:
+        return (
+            manifest is not None and self.build_hash is not None
+            and manifest.get("build_hash") == self.build_hash
+            and all(isfile(f'{self.root_folder}/{path}') for path in manifest.get("files", {}))
+        )
+
+    def write_file(self, path: str, content: str | bytes, mode: str) -> None:
+        full_path = f'{self.root_folder}/{path}'
+        makedirs(dirname(full_path), exist_ok=True)
+
+        if isinstance(content, bytes):
+            with open(full_path, f'{mode}b') as output_file:
+                output_file.write(content)
+        else:
+            with open(full_path, f'{mode}t') as output_file:
+                output_file.write(content)
+
+    def remove_file(self, path: str) -> None:
+        remove(f'{self.root_folder}/{path}')
+
+        # remove directories that are left empty:
+        directory = dirname(path)
+        while directory:
+            try:
+                rmdir(f'{self.root_folder}/{directory}')
+            except OSError:  # directory isn't empty
+                break
+            directory = dirname(directory)
+
+    def write_files(self, manifest: dict | None) -> tuple[int, int]:
+        old_hashes: dict[str, str] = manifest.get("files", {}) if manifest is not None else {}
+        new_hashes: dict[str, str] = {}
+        written_count = 0
+
+        for path, content in self.output_files.items():
+            content_hash = file_hash(content)
+            new_hashes[path] = content_hash
+
+            if old_hashes.get(path) == content_hash and isfile(f'{self.root_folder}/{path}'):
+                continue  # file didn't change, don't rewrite it
+
+            self.write_file(path, content, 'w' if self.incremental else 'x')
+            written_count += 1
+
+        stale_paths = sorted(old_hashes.keys() - new_hashes.keys())  # files from previous build that aren't generated
+        for path in stale_paths:
+            if isfile(f'{self.root_folder}/{path}'):
+                self.remove_file(path)
+
+        if self.incremental:  # manifest is only read back by incremental builds
+            self.save_manifest(new_hashes)
+
+        return written_count, len(stale_paths)
+
+    # ---------------- Build ---------------- :
     def build(self):
         start_time = time()  # keep track of start time
 
         if self.verbose:
             print(f'Building with name "{self.datapack_name}" (id: "{self.datapack_id}")')
 
-        try:
-            mkdir(f"{self.root_folder}")  # create root folder
-        except FileExistsError:
-            print(text_error(f"Can't build file: {self.datapack_name !r} folder exists already!"))
-            exit()
-
-        mkdir(f'{self.root_folder}/data')
+        manifest = None
+        if self.incremental:
+            manifest = self.load_manifest()
 
-        # minecraft folders:
-        if self.verbose:
-            print('Creating default folders...', end=" ")
+            if self.is_up_to_date(manifest):
+                if self.verbose:
+                    print(f'{self.datapack_name} is up to date, nothing to compile.')
+                return
 
-        mkdir(f'{self.root_folder}/data/minecraft')
-        mkdir(f'{self.root_folder}/data/minecraft/tags')
-        mkdir(f'{self.root_folder}/data/minecraft/tags/functions')
+            makedirs(self.root_folder, exist_ok=True)
 
-        # datapack folders:
-        mkdir(f'{self.root_folder}/data/{self.datapack_id}')
-        mkdir(f'{self.root_folder}/data/{self.datapack_id}/functions')
-        mkdir(f'{self.root_folder}/data/{self.datapack_id}/functions/code_blocks')
-        mkdir(f'{self.root_folder}/data/{self.datapack_id}/functions/user_functions')
+        elif isdir(self.root_folder):
+            print(text_error(f"Can't build file: {self.datapack_name !r} folder exists already!"))
+            exit()
 
         # default stuff
         if self.verbose:
-            print('Done!')
             print('Building Templates...', end=" ")
 
-        with (
-            open(f'{module_folder}/compiler/build_templates/pack.mcmeta', 'rt') as template_file,
-            open(f'{self.root_folder}/pack.mcmeta', 'xt') as output_file
-        ):
+        with open(f'{module_folder}/compiler/build_templates/pack.mcmeta', 'rt') as template_file:
             template_text = template_file.read()
-            # copy pack.mcmeta template to datapack with correct pack_format version:
-            output_file.write(template_text.replace("PACK_FORMAT", COMMON_CONFIG["pack_format"]))
+        # copy pack.mcmeta template to datapack with correct pack_format version:
+        self.add_file('pack.mcmeta', template_text.replace("PACK_FORMAT", COMMON_CONFIG["pack_format"]))
 
         # Copy datapack icon img:
-        copyfile(f'{module_folder}/compiler/build_templates/pack.png', f'{self.root_folder}/pack.png')
+        self.add_template_file('pack.png', 'pack.png')
 
         # Minecraft function tags
-
-        with (
-            open(f'{module_folder}/compiler/build_templates/function_tags.json', 'rt') as template_file,
-            open(f'{self.root_folder}/data/minecraft/tags/functions/tick.json', 'xt') as tick_file,
-            open(f'{self.root_folder}/data/minecraft/tags/functions/load.json', 'xt') as load_file
-        ):
+        with open(f'{module_folder}/compiler/build_templates/function_tags.json', 'rt') as template_file:
             template_content = template_file.read()
-            tick_file.write(template_content.replace('NAME', self.datapack_id).replace('FILETYPE', 'main'))
-            load_file.write(template_content.replace('NAME', self.datapack_id).replace('FILETYPE', 'init'))
+        self.add_file(
+            'data/minecraft/tags/functions/tick.json',
+            template_content.replace('NAME', self.datapack_id).replace('FILETYPE', 'main')
+        )
+        self.add_file(
+            'data/minecraft/tags/functions/load.json',
+            template_content.replace('NAME', self.datapack_id).replace('FILETYPE', 'init')
+        )
 
         if self.verbose:
             print("Done!")
@@ -216,15 +278,52 @@ class Compiler:
         # Functions folder and mcfunction files:
         if self.verbose:
             print("Compiling program...", end=" ")
-        mcs_compile(
-            self.ast,
-            f'{self.root_folder}/data/{self.datapack_id}/functions',
-            self.datapack_id
-        )
+        optimized_ast = optimize_ast(self.ast)  # AST-level optimizations (e.g. constant folding)
+        compiled_functions = mcs_compile(optimized_ast, self.datapack_id)
         if self.verbose:
             print("Done!")
 
+        if COMMON_CONFIG["inline_threshold"] > 0:
+            if self.verbose:
+                print("Inlining small functions...", end=" ")
+            compiled_functions, inlined_count = inline_function_calls(
+                compiled_functions, self.datapack_id, COMMON_CONFIG["inline_threshold"]
+            )
+            if self.verbose:
+                print(f"Done! ({inlined_count} calls inlined)")
+
+        if COMMON_CONFIG["dead_code_elimination"]:
+            if self.verbose:
+                print("Removing dead code...", end=" ")
+            compiled_functions, removed_file_count, removed_command_count = eliminate_dead_code(
+                compiled_functions, self.datapack_id, public_user_functions=COMMON_CONFIG["public_user_functions"]
+            )
+            if self.verbose:
+                print(f"Done! ({removed_file_count} files and {removed_command_count} commands removed)")
+
+        if COMMON_CONFIG["reuse_temporaries"]:
+            if self.verbose:
+                print("Reusing temporary storage slots...", end=" ")
+            compiled_functions, moved_count, slot_count = reuse_temporary_slots(compiled_functions, self.datapack_id)
+            if self.verbose:
+                print(f"Done! ({moved_count} temporaries moved to {slot_count} slots)")
+
+        for fnc_name, content in compiled_functions.items():
+            self.add_file(f'data/{self.datapack_id}/functions/{fnc_name}.mcfunction', content)
+
+        # Write everything to disk:
+        if self.verbose:
+            print("Writing files...", end=" ")
+        written_count, removed_count = self.write_files(manifest)
+        if self.verbose:
+            print(f"Done! ({written_count} written, {removed_count} removed, "
+                  f"{len(self.output_files) - written_count} unchanged)")
+
         elapsed_time = time() - start_time
 
         if self.verbose:
             print(f'Finished compiling {self.datapack_name}! Time Elapsed: {elapsed_time: 0.3f}s')
+
+
+def file_hash(content: str | bytes) -> str:
+    return sha256(content if isinstance(content, bytes) else content.encode('utf-8')).hexdigest()
@@ -0,0 +1,190 @@
+import re
+
+# functions that are run from outside the compiled program (tick/load/kill files & clickable items):
+root_functions = ("user_functions/init", "user_functions/main", "user_functions/kill")
+root_function_folders = ("clickable_items/",)
+user_function_folder = "user_functions/"  # user functions can also be run in-game with /function
+
+# storage paths that can be removed when nothing reads them (variables and temporary values):
+storage_path_pattern = re.compile(r"(?<![\w.$])((?:variable|number|string|boolean|list|unknown|null)\.[\w-]+)")
+
+# macro arguments of loop variables are read from the loop's variable storage ("function ... with storage ... variable"):
+macro_argument_pattern = re.compile(r"\$\(([\w-]+)\)")
+variable_macro_call_template = r"function {}:([\w/.-]+) with storage (\S+) variable$"
+
+# commands that only write to a storage path (optionally reading from somewhere else):
+storage_write_pattern = re.compile(
+    r"data modify storage \S+ (?P<modify>[^\s$]+) (?:set|merge|append|prepend|insert -?\d+) "
+    r"|data remove storage \S+ (?P<remove>[^\s$]+)$"
+    r"|execute store (?:result|success) storage \S+ (?P<store>[^\s$]+) \S+ \S+ run (?:scoreboard players get|data get) "
+)
+
+# "current" is a scratch value of every storage; a value written to it is dead if it's overwritten before being read:
+current_write_pattern = re.compile(r"data modify storage (\S+) current set ")
+current_read_pattern = re.compile(r"storage (\S+) current\b")
+
+
+class StorageCommand:
+    def __init__(self, function_name: str, line_index: int, line: str, reads_macro_variables: bool = False):
+        self.function_name = function_name
+        self.line_index = line_index
+        self.written_path: str | None = None
+        self.read_paths: list[str] = []
+
+        write_match = storage_write_pattern.match(line)
+        read_text = line
+        if write_match is not None:
+            target = write_match.group("modify") or write_match.group("remove") or write_match.group("store")
+            target_match = storage_path_pattern.match(target)
+            if target_match is not None:  # only writes to variables and temporary values are tracked
+                self.written_path = target_match.group(1)
+                read_text = line[write_match.end():]
+
+        self.read_paths = [path for path in storage_path_pattern.findall(read_text) if path != self.written_path]
+        if reads_macro_variables and line.startswith("$"):
+            self.read_paths.extend(f"variable.{argument}" for argument in macro_argument_pattern.findall(line))
+
+    def __repr__(self) -> str:
+        return f"StorageCommand({self.function_name !r}, {self.written_path !r}, {self.read_paths !r})"
+
+
+def is_command(line: str) -> bool:
+    return line != "" and not line.startswith("#")
+
+
+def get_called_functions(content: str, datapack_id: str) -> set[str]:
+    return set(re.findall(rf"function {re.escape(datapack_id)}:([\w/.-]+)", content))
+
+
+def variable_macro_functions(functions: dict[str, list[str]], datapack_id: str) -> set[str]:
+    # functions called with their own variable storage as macro arguments (their $(name) reads variable.name)
+    call_pattern = re.compile(variable_macro_call_template.format(re.escape(datapack_id)))
+    macro_functions = set()
+
+    for lines in functions.values():
+        for line in lines:
+            call_match = call_pattern.search(line)
+            if call_match is None:
+                continue
+
+            function_name, storage = call_match.groups()
+            own_storage = f"storage {storage} variable."
+            if any(own_storage in function_line for function_line in functions.get(function_name, ())):
+                macro_functions.add(function_name)
+
+    return macro_functions
+
+
+def reachable_functions(functions: dict[str, str], datapack_id: str, *, public_user_functions: bool) -> set[str]:
+    roots = root_function_folders + ((user_function_folder,) if public_user_functions else ())
+    to_visit = [name for name in functions if name in root_functions or name.startswith(roots)]
+    reachable = set(to_visit)
+
+    while to_visit:
+        for called_function in get_called_functions(functions[to_visit.pop()], datapack_id):
+            if called_function in functions and called_function not in reachable:
+                reachable.add(called_function)
+                to_visit.append(called_function)
+
+    return reachable
+
+
+def remove_dead_stores(functions: dict[str, list[str]], datapack_id: str) -> int:
+    macro_functions = variable_macro_functions(functions, datapack_id)
+    commands = [
+        StorageCommand(function_name, i, line, function_name in macro_functions)
+        for function_name, lines in functions.items()
+        for i, line in enumerate(lines) if is_command(line)
+    ]
+
+    read_counts: dict[str, int] = {}
+    writes: dict[str, list[StorageCommand]] = {}
+    for command in commands:
+        for path in command.read_paths:
+            read_counts[path] = read_counts.get(path, 0) + 1
+        if command.written_path is not None:
+            writes.setdefault(command.written_path, []).append(command)
+
+    dead_paths = [path for path in writes if read_counts.get(path, 0) == 0]
+    removed_commands: list[StorageCommand] = []
+
+    while dead_paths:
+        for command in writes.pop(dead_paths.pop(), ()):
+            removed_commands.append(command)
+
+            for path in command.read_paths:  # removed command doesn't read its sources anymore
+                read_counts[path] -= 1
+                if read_counts[path] == 0 and path in writes:
+                    dead_paths.append(path)
+
+    removed_lines: dict[str, set[int]] = {}
+    for command in removed_commands:
+        removed_lines.setdefault(command.function_name, set()).add(command.line_index)
+
+    for function_name, line_indexes in removed_lines.items():
+        functions[function_name] = [
+            line for i, line in enumerate(functions[function_name]) if i not in line_indexes
+        ]
+
+    return len(removed_commands)
+
+
+def remove_overwritten_current_values(functions: dict[str, list[str]]) -> int:
+    removed_count = 0
+
+    for function_name, lines in functions.items():
+        overwritten_storages: set[str] = set()  # storages whose current value is overwritten before it's read
+        kept_lines = []
+
+        for line in reversed(lines):
+            if not is_command(line):
+                kept_lines.append(line)
+                continue
+
+            write_match = current_write_pattern.match(line)
+            if write_match is not None and write_match.group(1) in overwritten_storages:
+                removed_count += 1
+                continue
+
+            if line.startswith("$") or "function " in line:  # other functions (or macros) could read any value
+                overwritten_storages.clear()
+            else:
+                read_text = line[write_match.end():] if write_match is not None else line
+                overwritten_storages.difference_update(current_read_pattern.findall(read_text))
+
+            if write_match is not None:
+                overwritten_storages.add(write_match.group(1))
+            kept_lines.append(line)
+
+        functions[function_name] = kept_lines[::-1]
+
+    return removed_count
+
+
+def eliminate_dead_code(functions: dict[str, str], datapack_id: str, *,
+                        public_user_functions: bool = True) -> tuple[dict[str, str], int, int]:
+    """
+    Removes functions that can't be reached from the datapack's entry points,
+    and writes to variables / temporary values that are never read.
+    Returns the remaining functions, the number of removed files and the number of removed commands.
+    """
+    reachable = reachable_functions(functions, datapack_id, public_user_functions=public_user_functions)
+    unreachable = [name for name in functions if name not in reachable]
+    removed_command_count = sum(
+        sum(map(is_command, functions[name].split("\n"))) for name in unreachable
+    )
+
+    function_lines = {name: content.split("\n") for name, content in functions.items() if name in reachable}
+    while True:  # removing a command can make the values it reads dead as well
+        newly_removed_count = (
+            remove_dead_stores(function_lines, datapack_id) + remove_overwritten_current_values(function_lines)
+        )
+        if newly_removed_count == 0:
+            break
+        removed_command_count += newly_removed_count
+
+    return (
+        {name: "\n".join(lines) for name, lines in function_lines.items()},
+        len(unreachable),
+        removed_command_count
+    )
@@ -0,0 +1,79 @@
+import re
+from .dead_code import is_command, get_called_functions
+
+return_pattern = re.compile(r"(?:^|\brun )return\b")
+
+
+def has_control_flow(line: str) -> bool:
+    # macro lines only work in a function called "with" arguments, and "return" would exit the caller instead
+    return line.startswith("$") or return_pattern.search(line) is not None
+
+
+def recursive_functions(functions: dict[str, list[str]], datapack_id: str) -> set[str]:
+    calls = {name: get_called_functions("\n".join(lines), datapack_id) & functions.keys() for name, lines in functions.items()}
+    recursive = set()
+
+    for name in functions:
+        to_visit = list(calls[name])
+        visited = set()
+        while to_visit:
+            called_function = to_visit.pop()
+            if called_function == name:
+                recursive.add(name)
+                break
+
+            if called_function not in visited:
+                visited.add(called_function)
+                to_visit.extend(calls[called_function])
+
+    return recursive
+
+
+def inline_function_calls(functions: dict[str, str], datapack_id: str, threshold: int) -> tuple[dict[str, str], int]:
+    """
+    Replaces calls to small functions (at most "threshold" commands) by the commands themselves.
+    Calls behind "execute ... run" are only replaced if the function is a single command.
+    Returns the new functions and the number of inlined calls.
+    """
+    function_lines = {name: content.split("\n") for name, content in functions.items()}
+    recursive = recursive_functions(function_lines, datapack_id)
+    call_pattern = re.compile(
+        rf"(?P<prefix>(?:execute (?:(?!\bstore\b).)* run )?)function {re.escape(datapack_id)}:(?P<name>[\w/.-]+)$"
+    )
+    inlined_count = 0
+
+    while True:  # inlined functions can contain calls to other small functions
+        inlinable: dict[str, list[str]] = {}
+        for name, lines in function_lines.items():
+            commands = [line for line in lines if is_command(line)]
+            if name not in recursive and len(commands) <= threshold and not any(map(has_control_flow, commands)):
+                inlinable[name] = commands
+
+        pass_count = 0
+        for name, lines in function_lines.items():
+            new_lines = []
+
+            for line in lines:
+                call_match = call_pattern.match(line)
+                commands = inlinable.get(call_match.group("name")) if call_match is not None else None
+
+                if commands is None or call_match.group("name") == name:
+                    new_lines.append(line)
+                elif not call_match.group("prefix"):
+                    new_lines.extend(commands)
+                    pass_count += 1
+                elif not commands:  # nothing to run
+                    pass_count += 1
+                elif len(commands) == 1:  # runs under the same conditions as the function did
+                    new_lines.append(call_match.group("prefix") + commands[0])
+                    pass_count += 1
+                else:
+                    new_lines.append(line)
+
+            function_lines[name] = new_lines
+
+        if pass_count == 0:
+            break
+        inlined_count += pass_count
+
+    return {name: "\n".join(lines) for name, lines in function_lines.items()}, inlined_count
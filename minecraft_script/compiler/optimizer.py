@@ -0,0 +1,112 @@
+from ..interpreter import types as mcs_types
+from ..lexer.tokens import Token
+from ..parser.nodes import *
+
+INT_MIN = -2 ** 31  # scoreboards (and thereby compiled numbers) are 32-bit integers
+INT_MAX = 2 ** 31 - 1
+MAX_FOLDED_STRING_LENGTH = 256  # longer strings are only folded if they don't grow (e.g. concatenation)
+
+# errors that can occur while evaluating an operation (the operation is then left for runtime):
+evaluation_errors = (TypeError, ValueError, ArithmeticError, AttributeError, NotImplementedError)
+
+
+class ConstantFolder:
+    """
+    Optimization pass over the parser AST that evaluates operations on literals
+    at compile time (using the same semantics as the debug interpreter).
+    Nodes are updated in place.
+    """
+
+    def visit(self, node):
+        if isinstance(node, ParserNode):
+            method = getattr(self, f"visit_{type(node).__name__}", self.visit_children)
+            return method(node)
+
+        if isinstance(node, list):
+            return [self.visit(item) for item in node]
+
+        if isinstance(node, tuple):
+            return tuple(self.visit(item) for item in node)
+
+        if isinstance(node, dict):
+            return {key: self.visit(value) for key, value in node.items()}
+
+        return node  # token, str or None
+
+    def visit_children(self, node: ParserNode) -> ParserNode:
+        for slot in type(node).__slots__:
+            setattr(node, slot, self.visit(getattr(node, slot)))
+
+        return node
+
+    # ------------------ Operations ------------------ :
+    def visit_BinaryOperationNode(self, node: BinaryOperationNode) -> ParserNode:
+        self.visit_children(node)
+        left_value = literal_value(node.get_left_node())
+        right_value = literal_value(node.get_right_node())
+
+        if left_value is None or right_value is None:
+            return node
+
+        try:
+            value_method = getattr(left_value, node.get_operator().variant.lower())
+            result = value_method(right_value)
+        except evaluation_errors:  # invalid operation, error has to happen at runtime
+            return node
+
+        if isinstance(result, mcs_types.MCSString) and len(result.get_value()) > max(
+                MAX_FOLDED_STRING_LENGTH, len(left_value.print_value()) + len(right_value.print_value())):
+            return node  # don't blow up the output with huge strings (e.g. "a" * 1000000)
+
+        return literal_node(result, node.get_position(), node)
+
+    def visit_UnaryOperationNode(self, node: UnaryOperationNode) -> ParserNode:
+        self.visit_children(node)
+        root_value = literal_value(node.get_root())
+
+        if root_value is None:
+            return node
+
+        try:
+            result = root_value.unary_operation(node.get_operator())
+        except evaluation_errors:
+            return node
+
+        return literal_node(result, node.get_position(), node)
+
+
+def literal_value(node: ParserNode) -> mcs_types.MCSObject | None:
+    if isinstance(node, NumberNode):
+        return mcs_types.MCSNumber(int(node.get_value()))
+
+    if isinstance(node, StringNode):
+        return mcs_types.MCSString(node.get_value())
+
+    if isinstance(node, BooleanNode):
+        return mcs_types.MCSBool(node.get_value())
+
+    if isinstance(node, NullNode):
+        return mcs_types.MCSNull()
+
+    return None  # not a literal
+
+
+def literal_node(value: mcs_types.MCSObject, position: tuple[int, int], fallback: ParserNode) -> ParserNode:
+    if isinstance(value, mcs_types.MCSBool):
+        return BooleanNode(Token("true" if value.get_value() else "false", "TT_BOOLEAN", position))
+
+    if isinstance(value, mcs_types.MCSNumber) and INT_MIN <= value.get_value() <= INT_MAX:
+        return NumberNode(Token(str(value.get_value()), "TT_NUMBER", position))
+
+    if isinstance(value, mcs_types.MCSString):
+        return StringNode(Token(value.get_value(), "TT_STRING", position))
+
+    return fallback  # can't be written as a literal (or would overflow at runtime)
+
+
+def fold_constants(ast: ParserNode) -> ParserNode:
+    return ConstantFolder().visit(ast)
+
+
+def optimize_ast(ast: ParserNode) -> ParserNode:
+    return fold_constants(ast)
@@ -0,0 +1,116 @@
+import re
+from .dead_code import is_command, get_called_functions
+
+# temporary values (every compiled expression gets its own path in the storage of its context):
+temporary_path_pattern = re.compile(r"(?<![\w.$])((?:number|string|boolean|list|unknown|null)\.[\w-]+)")
+temporary_storage_patterns = tuple(map(re.compile, (  # storage of a temporary, then its path
+    r"storage (mcs_[\w-]+) ((?:number|string|boolean|list|unknown|null)\.[\w-]+)",
+    r'"s\d": "(mcs_[\w-]+)", "n\d": "((?:number|string|boolean|list|unknown|null)\.[\w-]+)"',  # log arguments
+    r"storage (mcs_[\w-]+) current set value \{result: '((?:number|string|boolean|list|unknown|null)\.[\w-]+)'\}",  # get key
+)))
+call_pattern_template = r"function {}:([\w/.-]+)"
+
+
+class Temporary:
+    def __init__(self, path: str, function_name: str, line_index: int):
+        self.path = path
+        self.function_name = function_name
+        self.storage: str | None = None
+        self.start = self.end = line_index  # lines of the first and the last use
+
+    def __repr__(self) -> str:
+        return f"Temporary({self.path !r}, {self.storage !r}, {self.start !r}, {self.end !r})"
+
+
+def reentering_functions(functions: dict[str, list[str]], datapack_id: str) -> dict[str, set[str]]:
+    # for every function, the functions it can be run from again (itself included if it is recursive)
+    calls = {name: get_called_functions("\n".join(lines), datapack_id) & functions.keys() for name, lines in functions.items()}
+    reachable: dict[str, set[str]] = {}
+
+    for name in functions:
+        to_visit = list(calls[name])
+        visited = set()
+        while to_visit:
+            called_function = to_visit.pop()
+            if called_function not in visited:
+                visited.add(called_function)
+                to_visit.extend(calls[called_function])
+        reachable[name] = visited
+
+    return {name: {caller for caller in functions if name in reachable[caller]} for name in functions}
+
+
+def find_temporaries(functions: dict[str, list[str]], datapack_id: str) -> list[Temporary]:
+    temporaries: dict[str, Temporary] = {}
+    shared_paths: set[str] = set()  # used by more than one function (e.g. written by a macro function of a builtin)
+
+    for function_name, lines in functions.items():
+        for i, line in enumerate(lines):
+            if not is_command(line):
+                continue
+
+            for path in temporary_path_pattern.findall(line):
+                temporary = temporaries.get(path)
+                if temporary is None:
+                    temporary = temporaries[path] = Temporary(path, function_name, i)
+                elif temporary.function_name != function_name:
+                    shared_paths.add(path)
+                temporary.end = i
+
+            for pattern in temporary_storage_patterns:
+                for storage, path in pattern.findall(line):
+                    temporaries[path].storage = storage
+
+    # a value can't share its slot if the function it's used in can run again before the value is read:
+    reentering = reentering_functions(functions, datapack_id)
+    call_pattern = re.compile(call_pattern_template.format(re.escape(datapack_id)))
+
+    def is_reentered(temporary: Temporary) -> bool:
+        callers = reentering[temporary.function_name]
+        lines = functions[temporary.function_name][temporary.start:temporary.end + 1]
+        return any(called in callers for line in lines for called in call_pattern.findall(line))
+
+    return [
+        temporary for path, temporary in temporaries.items()
+        if path not in shared_paths and temporary.storage is not None and not is_reentered(temporary)
+    ]
+
+
+def reuse_temporary_slots(functions: dict[str, str], datapack_id: str) -> tuple[dict[str, str], int, int]:
+    """
+    Moves temporary values to a small pool of slots (temp.0, temp.1, ...) in the storage of their context.
+    A slot is free again after the last command that uses its value, and is then reused by the next value,
+    so a storage holds at most as many temporaries as are used at the same time.
+    Returns the new functions, the number of moved temporaries and the number of slots they use.
+    """
+    function_lines = {name: content.split("\n") for name, content in functions.items()}
+
+    storage_temporaries: dict[str, list[Temporary]] = {}
+    for temporary in find_temporaries(function_lines, datapack_id):
+        storage_temporaries.setdefault(temporary.storage, []).append(temporary)
+
+    renamed_paths: dict[str, dict[str, str]] = {}  # function name -> (temporary path -> slot)
+    moved_count = slot_count = 0
+    for temporaries in storage_temporaries.values():
+        if len({temporary.function_name for temporary in temporaries}) > 1:
+            continue  # the functions could run while each other's values are in use
+
+        slot_ends: list[int] = []  # last use of the value in every slot
+        for temporary in sorted(temporaries, key=lambda x: x.start):
+            slot = next((i for i, end in enumerate(slot_ends) if end < temporary.start), len(slot_ends))
+            if slot == len(slot_ends):
+                slot_ends.append(temporary.end)
+            slot_ends[slot] = temporary.end
+
+            renamed_paths.setdefault(temporary.function_name, {})[temporary.path] = f"temp.{slot}"
+
+        moved_count += len(temporaries)
+        slot_count += len(slot_ends)
+
+    for function_name, paths in renamed_paths.items():
+        function_lines[function_name] = [
+            temporary_path_pattern.sub(lambda match: paths.get(match.group(1), match.group(1)), line)
+            for line in function_lines[function_name]
+        ]
+
+    return {name: "\n".join(lines) for name, lines in function_lines.items()}, moved_count, slot_count
@@ -8,7 +8,20 @@ def reset_config() -> None:
         "pack_format": "41",
         "debug_comments": True,
         "verbose": True,
-        "default_output_path": "."
+        "default_output_path": ".",
+        "incremental_build": False,
+        "ast_cache": True,
+        "ast_cache_path": "~/.mcs_cache",
+        "ast_cache_max_size": 64,
+        "stable_ids": False,
+        "dead_code_elimination": True,
+        "public_user_functions": True,
+        "inline_threshold": 8,
+        "reuse_temporaries": True,
+        "debug_engine": "closure",
+        "debug_tick_limit": 1200,
+        "debug_tick_budget": 50,
+        "debug_loop_report": False
     }
 
     json_file_content: str = (
@@ -49,6 +62,23 @@ def config_boolean_check(value: str, setting: str) -> bool:
     return eval(py_value)  # safe to eval here
 
 
+def config_integer_check(value: str, setting: str, minimum: int = 0) -> int:
+    if not value.isdigit() or int(value) < minimum:
+        expected = "a non-negative integer" if minimum == 0 else f"an integer of at least {minimum}"
+        print(f"Error: incorrect value {value !r} for setting {setting !r} (expected {expected})")
+        exit(-1)
+
+    return int(value)
+
+
+def config_choice_check(value: str, setting: str, choices: tuple[str, ...]) -> str:
+    if value not in choices:
+        print(f"Error: incorrect value {value !r} for setting {setting !r} (expected one of {', '.join(choices)})")
+        exit(-1)
+
+    return value
+
+
 def config_path_check(value: str, setting: str) -> str:
     path = value.replace("\\", "/")
     if not os.path.exists(path):
@@ -58,9 +88,31 @@ def config_path_check(value: str, setting: str) -> str:
     return path
 
 
+def config_folder_path_check(value: str, setting: str) -> str:
+    # folder is created when it's first needed, so it doesn't have to exist yet
+    if not value.strip():
+        print(f"Error: empty path for setting {setting !r}")
+        exit(-1)
+
+    return os.path.expanduser(value.replace("\\", "/"))
+
+
 config_value_wrapper = {
     "pack_format": lambda x: x,  # don't check (it's just text anyway, it can be whatever)
     "debug_comments": lambda x: config_boolean_check(x, "debug_comments"),
     "verbose": lambda x: config_boolean_check(x, "verbose"),
     "default_output_path": lambda x: config_path_check(x, "default_output_path"),
+    "incremental_build": lambda x: config_boolean_check(x, "incremental_build"),
+    "ast_cache": lambda x: config_boolean_check(x, "ast_cache"),
+    "ast_cache_path": lambda x: config_folder_path_check(x, "ast_cache_path"),
+    "ast_cache_max_size": lambda x: config_integer_check(x, "ast_cache_max_size", 1),  # in megabytes
+    "stable_ids": lambda x: config_boolean_check(x, "stable_ids"),
+    "dead_code_elimination": lambda x: config_boolean_check(x, "dead_code_elimination"),
+    "public_user_functions": lambda x: config_boolean_check(x, "public_user_functions"),
+    "inline_threshold": lambda x: config_integer_check(x, "inline_threshold"),  # in commands (0 disables inlining)
+    "reuse_temporaries": lambda x: config_boolean_check(x, "reuse_temporaries"),
+    "debug_engine": lambda x: config_choice_check(x, "debug_engine", ("closure", "tree")),
+    "debug_tick_limit": lambda x: config_integer_check(x, "debug_tick_limit"),  # 0 disables the limit
+    "debug_tick_budget": lambda x: config_integer_check(x, "debug_tick_budget"),  # in milliseconds
+    "debug_loop_report": lambda x: config_boolean_check(x, "debug_loop_report"),
 }
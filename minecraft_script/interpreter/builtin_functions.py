@@ -1,9 +1,8 @@
-from .types import MCSFunction, MCSNull, MCSString, MCSNumber, MCSList
+from .types import MCSFunction, MCSNull, MCSString, MCSNumber, MCSList, RuntimeResult
 from ..errors import MCSValueError, MCSTypeError
 
 
 def custom_log(args, context):
-    from .interpreter import RuntimeResult
     if len(args) > 5:
         raise MCSTypeError(f"Function <builtin-log> takes up to 5 arguments, got {len(args)}")
 
@@ -12,7 +11,6 @@ def custom_log(args, context):
 
 
 def custom_concatenate(args, context):
-    from .interpreter import RuntimeResult
     if len(args) > 2:
         raise MCSTypeError(f"Function <builtin-concatenate> takes 2 arguments, got {len(args)}")
 
@@ -23,12 +21,10 @@ def custom_concatenate(args, context):
         raise MCSTypeError(
             f"Function <builtin-concatenate> takes 2 strings as arguments, got {string_1.class_name() !r} and {string_2.class_name() !r}")
 
-    return RuntimeResult(return_value=MCSString(string_1.get_value() + string_2.get_value()))
+    return RuntimeResult(return_value=string_1.concatenate(string_2))
 
 
 def custom_command(args, context):
-    from .interpreter import RuntimeResult
-
     # Check if argument count is correct
     if len(args) != 1:
         raise MCSTypeError(f"Function <builtin-command> takes 1 argument, got {len(args)}")
@@ -43,8 +39,6 @@ def custom_command(args, context):
 
 
 def custom_get_block(args, context):
-    from .interpreter import RuntimeResult
-
     if len(args) != 3:
         raise MCSTypeError(f"Function <builtin-get_block> takes 3 arguments, got {len(args)}")
 
@@ -59,8 +53,6 @@ def custom_get_block(args, context):
 
 
 def custom_set_block(args, context):
-    from .interpreter import RuntimeResult
-
     if len(args) != 4:
         raise MCSTypeError(f"Function <builtin-set_block> takes 4 arguments, got {len(args)}")
 
@@ -77,8 +69,6 @@ def custom_set_block(args, context):
 
 
 def custom_give_item(args, context):
-    from .interpreter import RuntimeResult
-
     if not (1 <= len(args) <= 3):
         raise MCSTypeError(f"Function <builtin-give_item> takes between 1 and 3 arguments, got {len(args)}")
 
@@ -102,8 +92,6 @@ def custom_give_item(args, context):
 
 
 def custom_give_clickable_item(args, context):
-    from .interpreter import RuntimeResult
-
     if not (1 <= len(args) <= 3):
         raise MCSTypeError(f"Function <builtin-give_clickable_item> takes between 1 and 3 arguments, got {len(args)}")
 
@@ -126,8 +114,6 @@ def custom_give_clickable_item(args, context):
 
 
 def custom_raycast_block(args, context):
-    from .interpreter import RuntimeResult
-
     if not 2 <= len(args) <= 3:
         raise MCSTypeError(f"Function <builtin-raycast_block> takes between 2 and 3 arguments, got {len(args)}")
 
@@ -151,8 +137,6 @@ def custom_raycast_block(args, context):
 
 
 def custom_raycast_entity(args, context):
-    from .interpreter import RuntimeResult
-
     if not 2 <= len(args) <= 3:
         raise MCSTypeError(f"Function <builtin-raycast_entity> takes between 2 and 3 arguments, got {len(args)}")
 
@@ -176,8 +160,6 @@ def custom_raycast_entity(args, context):
 
 
 def custom_append(args, context):
-    from .interpreter import RuntimeResult
-
     if len(args) != 2:
         raise MCSTypeError(f"Function <builtin-append> takes 2 arguments, got {len(args)}")
 
@@ -189,14 +171,12 @@ def custom_append(args, context):
     if isinstance(value, (MCSFunction, MCSList)):
         raise MCSTypeError(f"Value can't be of type Function or List, got {value.class_name() !r}")
 
-    append_list.get_value().append(value)  # actually append the value
+    append_list.append(value)  # actually append the value
 
     return RuntimeResult(return_value=MCSNull())
 
 
-def custom_range(args, context):
-    from .interpreter import RuntimeResult
-
+def get_range_bound(args) -> int:
     if len(args) != 1:
         raise MCSTypeError(f"Function <builtin-range> takes 1 argument, got {len(args)}")
 
@@ -208,9 +188,11 @@ def custom_range(args, context):
     if bounding_value.get_value() < 1:
         raise MCSValueError(f"Bounding value has to be over 0, got {bounding_value.get_value()}")
 
-    return RuntimeResult(return_value=MCSList(list(
-        map(lambda num: MCSNumber(num), range(bounding_value.get_value()))
-    )))
+    return bounding_value.get_value()
+
+
+def custom_range(args, context):
+    return RuntimeResult(return_value=MCSList(range(get_range_bound(args))))  # numbers are created when read
 
 
 builtin_functions = [
@@ -220,3 +202,5 @@ builtin_functions = [
     custom_raycast_block, custom_raycast_entity,
     custom_append, custom_range,
 ]
+
+builtin_names = tuple(py_function.__name__[7:] for py_function in builtin_functions)  # skip "custom_" part of name
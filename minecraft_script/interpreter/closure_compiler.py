@@ -0,0 +1,549 @@
+from ..errors import *
+from ..common import get_visit_method
+from ..parser.nodes import *
+from .types import *
+from .interpreter import SymbolTable, RuntimeResult
+from .scheduler import TickScheduler
+from .builtin_functions import custom_range, get_range_bound
+from .resolver import GLOBAL_DEPTH, Resolver, Scope, resolve_names
+import operator
+
+# operations that can skip the (generic) type methods if both operands are numbers:
+number_operations = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.floordiv,
+    "modulus": operator.mod,
+}
+
+number_comparisons = {
+    "equals": operator.eq,
+    "less_than": operator.lt,
+    "greater_than": operator.gt,
+    "less_equals_than": operator.le,
+    "greater_equals_than": operator.ge,
+}
+
+# nodes whose result is a return value (or None) instead of a value:
+statement_nodes = (
+    VariableDeclareNode, VariableSetNode, SetKeyNode, DefineFunctionNode, ReturnNode, IfConditionNode,
+    WhileLoopNode, AsyncWhileLoopNode, ForLoopNode, CodeBlockNode, MultilineCodeNode,
+)
+
+
+class Frame:
+    """
+    Runtime scope. Slots that haven't been declared yet are None.
+    """
+    __slots__ = ('scope', 'parent', 'root', 'values')
+
+    def __init__(self, scope: Scope, parent: "Frame" = None):
+        self.scope = scope
+        self.parent = parent
+        self.root: Frame = parent.root if parent is not None else self  # frame of the program's top level
+        self.values: list = [None] * len(scope.slots)
+
+    def get(self, name: str) -> any:
+        frame = self
+        while frame is not None:
+            slot = frame.scope.slots.get(name)
+            if slot is not None and frame.values[slot] is not None:
+                return frame.values[slot]
+
+            frame = frame.parent
+
+        raise MCSNameError(f"Name {name !r} is not defined.")
+
+    def set(self, name: str, new_value: any) -> None:
+        frame = self
+        while frame is not None:
+            slot = frame.scope.slots.get(name)
+            if slot is not None and frame.values[slot] is not None:
+                frame.values[slot] = new_value
+                return
+
+            frame = frame.parent
+
+        raise MCSNameError(f"Name {name !r} is not defined.")
+
+    def get_symbols(self) -> dict:
+        return {name: self.values[slot] for name, slot in self.scope.slots.items() if self.values[slot] is not None}
+
+    def __repr__(self) -> str:
+        return f"Frame({self.scope !r}, {self.parent !r})"
+
+
+class ClosureFunction(MCSFunction):
+    def __init__(self, name: str, body, parameter_names: tuple[str, ...], scope: Scope, parameter_slots: tuple[int, ...],
+                 body_code):
+        super().__init__(name, body, parameter_names)
+        self.scope = scope
+        self.parameter_slots = parameter_slots
+        self.body_code = body_code
+
+    def invoke(self, arg_list: list, frame: Frame) -> MCSObject:
+        local_frame = Frame(self.scope, frame)  # functions see the names of their caller
+
+        if len(arg_list) != self.parameter_count:
+            raise MCSValueError(f"Function {self.print_value()} takes {self.parameter_count} arguments, got {len(arg_list)}")
+
+        values = local_frame.values
+        for slot, argument in zip(self.parameter_slots, arg_list):
+            values[slot] = argument if argument is not None else MCS_NULL
+
+        return_value = self.body_code(local_frame)
+        return return_value if return_value is not None else MCS_NULL
+
+    def call(self, arg_list: list, context) -> RuntimeResult:
+        return RuntimeResult(return_value=self.invoke(arg_list, context))
+
+
+class ClosureCompiler:
+    """
+    Alternative execution engine for the debug interpreter.
+    The AST is compiled once into nested Python closures; variable slots
+    are resolved at compile time, so loops don't re-walk the tree.
+
+    Expression closures return a value, statement closures return
+    a return value (or None if no "return" statement was run).
+    """
+    dispatch_table: dict[type, callable] = {}  # node type -> compile method, filled once per class
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch_table = {}
+
+    def __init__(self, resolver: Resolver, *, scheduler: TickScheduler = None):
+        self.resolver = resolver  # scopes and variable addresses of the compiled program
+        self.scheduler = TickScheduler() if scheduler is None else scheduler  # runs the next iterations of async loops
+
+    def compile(self, node, scope: Scope):
+        method = self.dispatch_table.get(node.__class__)
+        if method is None:
+            method = self.dispatch_table[node.__class__] = get_visit_method(
+                type(self), node.__class__, "compile_", "compile_unknown"
+            )
+
+        return method(self, node, scope)
+
+    def compile_statement(self, node, scope: Scope):
+        if is_statement(node):
+            return self.compile(node, scope)
+
+        expression = self.compile(node, scope)
+
+        def run_expression(frame: Frame) -> None:
+            expression(frame)
+
+        return run_expression
+
+    def compile_program(self, node) -> tuple[Scope, callable]:
+        scope = self.resolver.global_scope
+        return scope, self.compile_statement(node, scope)
+
+    # --------------- Builtin Types --------------- :
+    def compile_NumberNode(self, node, scope: Scope):
+        value = MCSNumber(int(node.get_value()))  # values are never modified, so a single instance can be reused
+        return lambda frame: value
+
+    def compile_BooleanNode(self, node, scope: Scope):
+        value = MCSBool(node.get_value())
+        return lambda frame: value
+
+    def compile_StringNode(self, node, scope: Scope):
+        value = MCSString(node.get_value())
+        return lambda frame: value
+
+    def compile_ListNode(self, node, scope: Scope):
+        elements = tuple(self.compile(value_node, scope) for value_node in node.get_node_list())
+        return lambda frame: MCSList([element(frame) for element in elements])
+
+    def compile_NullNode(self, node, scope: Scope):
+        value = MCS_NULL
+        return lambda frame: value
+
+    # --------------- Type Manipulation --------------- :
+    def compile_GetKeyNode(self, node, scope: Scope):
+        atom = self.compile(node.get_atom(), scope)
+        key = self.compile(node.get_key(), scope)
+        return lambda frame: atom(frame).get_key(key(frame))
+
+    def compile_SetKeyNode(self, node, scope: Scope):
+        key = self.compile(node.get_key(), scope)
+        value = self.compile(node.get_value(), scope)
+        get_iterable = self.compile_lookup(node.get_name(), node.address)
+
+        def set_key(frame: Frame) -> None:
+            key_value = key(frame)
+            new_value = value(frame)
+            get_iterable(frame).set_key(key_value, new_value)
+
+        return set_key
+
+    def compile_AttributeGetNode(self, node, scope: Scope):
+        root = self.compile(node.get_root(), scope)
+        attribute_name: str = node.get_name()
+        method_name = f"attribute_{attribute_name}"
+
+        def get_attribute(frame: Frame):
+            root_value = root(frame)
+            attribute = getattr(root_value, method_name, None)
+            if attribute is None:
+                return root_value.attribute_not_present(attribute_name)
+
+            return attribute()
+
+        return get_attribute
+
+    # --------------- Variables --------------- :
+    @staticmethod
+    def compile_lookup(name: str, address: tuple[int, int] | None):
+        if address is None:  # only known at runtime
+            return lambda frame: frame.get(name)
+
+        depth, slot = address
+        if depth == GLOBAL_DEPTH:
+            def get_global(frame: Frame):
+                value = frame.root.values[slot]
+                if value is None:
+                    raise MCSNameError(f"Name {name !r} is not defined.")
+
+                return value
+
+            return get_global
+
+        if depth == 0:
+            def get_local(frame: Frame):
+                value = frame.values[slot]
+                return value if value is not None else frame.get(name)  # not declared yet
+
+            return get_local
+
+        if depth == 1:
+            def get_parent(frame: Frame):
+                value = frame.parent.values[slot]
+                return value if value is not None else frame.get(name)
+
+            return get_parent
+
+        def get_outer(frame: Frame):
+            outer_frame = frame
+            for _ in range(depth):
+                outer_frame = outer_frame.parent
+
+            value = outer_frame.values[slot]
+            return value if value is not None else frame.get(name)
+
+        return get_outer
+
+    def compile_VariableAccessNode(self, node, scope: Scope):
+        return self.compile_lookup(node.get_name(), node.address)
+
+    def compile_VariableDeclareNode(self, node, scope: Scope):
+        slot = scope.slots[node.get_name()]
+        value = self.compile(node.get_value(), scope)
+
+        def declare(frame: Frame) -> None:
+            new_value = value(frame)
+            frame.values[slot] = new_value if new_value is not None else MCS_NULL
+
+        return declare
+
+    def compile_VariableSetNode(self, node, scope: Scope):
+        name = node.get_name()
+        value = self.compile(node.get_value(), scope)
+
+        if node.address is None:
+            def set_dynamic(frame: Frame) -> None:
+                frame.set(name, value(frame))
+
+            return set_dynamic
+
+        depth, slot = node.address
+
+        if depth == GLOBAL_DEPTH:
+            def set_global(frame: Frame) -> None:
+                new_value = value(frame)
+                values = frame.root.values
+                if values[slot] is None:
+                    raise MCSNameError(f"Name {name !r} is not defined.")
+
+                values[slot] = new_value
+
+            return set_global
+
+        def set_variable(frame: Frame) -> None:
+            new_value = value(frame)
+            outer_frame = frame
+            for _ in range(depth):
+                outer_frame = outer_frame.parent
+
+            if outer_frame.values[slot] is not None:
+                outer_frame.values[slot] = new_value
+            else:
+                frame.set(name, new_value)
+
+        return set_variable
+
+    # --------------- Functions --------------- :
+    def compile_DefineFunctionNode(self, node, scope: Scope):
+        name: str = node.get_name()
+        body = node.get_body()
+        parameter_names = tuple(node.get_parameter_names())
+
+        function_scope = self.resolver.get_scope(node)
+        parameter_slots = tuple(function_scope.slots[parameter] for parameter in parameter_names)
+        body_code = self.compile_statement(body, function_scope)
+        slot = scope.slots[name]
+
+        def define_function(frame: Frame) -> None:
+            frame.values[slot] = ClosureFunction(name, body, parameter_names, function_scope, parameter_slots, body_code)
+
+        return define_function
+
+    def compile_FunctionCallNode(self, node, scope: Scope):
+        root = self.compile(node.get_root(), scope)
+        arguments = tuple(self.compile(argument, scope) for argument in node.get_arguments())
+
+        def call_function(frame: Frame):
+            function = root(frame)
+            args = [argument(frame) for argument in arguments]
+
+            if function.__class__ is ClosureFunction:
+                return function.invoke(args, frame)
+
+            return function.call(args, frame).get_return_value()
+
+        return call_function
+
+    # --------------- Conditionals --------------- :
+    def compile_IfConditionNode(self, node, scope: Scope):
+        branches = []
+        for condition in node.get_conditions():
+            expression = self.compile(condition["expression"], scope) if condition.get("type") == "if" else None
+            branches.append((expression, self.compile_statement(condition["body"], scope)))
+
+        branches = tuple(branches)
+
+        def run_if(frame: Frame):
+            for expression, body in branches:
+                if expression is None or bool(expression(frame)) is True:
+                    return body(frame)
+
+        return run_if
+
+    # --------------- Loops --------------- :
+    def compile_WhileLoopNode(self, node, scope: Scope):
+        condition = self.compile(node.get_condition(), scope)
+        body = self.compile_statement(node.get_body(), scope)
+        position = node.get_position()
+        scheduler = self.scheduler
+
+        def run_while(frame: Frame):
+            iteration_count = 0
+            try:
+                while bool(condition(frame)) is True:
+                    iteration_count += 1
+                    return_value = body(frame)
+                    if return_value is not None:
+                        return return_value
+            finally:
+                scheduler.count_iterations(position, iteration_count)
+
+        return run_while
+
+    def compile_AsyncWhileLoopNode(self, node, scope: Scope):
+        condition = self.compile(node.get_condition(), scope)
+        body = self.compile_statement(node.get_body(), scope)
+        position = node.get_position()
+        scheduler = self.scheduler
+
+        def run_async_while(frame: Frame):
+            # first iteration is run right away, the next ones are run by the scheduler (one per simulated tick)
+            def run_iteration():
+                if bool(condition(frame)) is not True:
+                    return None
+
+                scheduler.count_iterations(position, 1)
+                return_value = body(frame)
+                if return_value is not None:
+                    return return_value  # returning ends the loop, the next iteration is never scheduled
+
+                scheduler.schedule(node, run_iteration)
+
+            return run_iteration()
+
+        return run_async_while
+
+    def compile_ForLoopNode(self, node, scope: Scope):
+        iterable_code = self.compile(node.get_iterable(), scope)
+        range_values = self.compile_range_values(node.get_iterable(), scope)
+        loop_scope = self.resolver.get_scope(node)
+        slot = loop_scope.slots[node.get_child_name()]
+        body = self.compile_statement(node.get_body(), loop_scope)
+        position = node.get_position()
+        scheduler = self.scheduler
+
+        def run_for(frame: Frame):
+            py_values = range_values(frame) if range_values is not None else None
+            if py_values is None:  # not a range, iterate over the values of the iterable
+                iterable = iterable_code(frame)
+                if iterable.is_iterable() is False:
+                    raise MCSTypeError(f"{iterable.class_name() !r} object is not iterable")
+
+                py_values = iterable.iter_values()
+
+            local_frame = Frame(loop_scope, frame)
+            values = local_frame.values
+            iteration_count = 0
+
+            try:
+                for py_value in py_values:
+                    values[slot] = py_value if py_value is not None else MCS_NULL
+
+                    iteration_count += 1
+                    return_value = body(local_frame)
+                    if return_value is not None:
+                        return return_value
+            finally:
+                scheduler.count_iterations(position, iteration_count)
+
+        return run_for
+
+    def compile_range_values(self, node, scope: Scope):
+        """
+        Closure that generates the numbers of a range(...) call iterable one by one instead of
+        as a list (it returns None if the function isn't the builtin range function).
+        """
+        if node.__class__ is not FunctionCallNode or node.get_root().__class__ is not VariableAccessNode:
+            return None  # only variable roots can be checked without running anything twice
+
+        root = self.compile(node.get_root(), scope)
+        arguments = tuple(self.compile(argument, scope) for argument in node.get_arguments())
+
+        def range_values(frame: Frame):
+            if root(frame).call is not custom_range:
+                return None
+
+            args = [argument(frame) for argument in arguments]
+            return map(new_number, range(get_range_bound(args)))
+
+        return range_values
+
+    # --------------- Operations --------------- :
+    def compile_BinaryOperationNode(self, node, scope: Scope):
+        left = self.compile(node.get_left_node(), scope)
+        right = self.compile(node.get_right_node(), scope)
+        method_name: str = node.get_operator().variant.lower()
+
+        if method_name in number_operations:
+            number_operation = number_operations[method_name]
+
+            def operate(frame: Frame):
+                left_operand = left(frame)
+                right_operand = right(frame)
+                if left_operand.__class__ is MCSNumber and right_operand.__class__ is MCSNumber:
+                    return new_number(number_operation(left_operand.value, right_operand.value))
+
+                return getattr(left_operand, method_name)(right_operand)
+
+            return operate
+
+        if method_name in number_comparisons:
+            number_comparison = number_comparisons[method_name]
+
+            def compare(frame: Frame):
+                left_operand = left(frame)
+                right_operand = right(frame)
+                if left_operand.__class__ is MCSNumber and right_operand.__class__ is MCSNumber:
+                    return MCS_TRUE if number_comparison(left_operand.value, right_operand.value) else MCS_FALSE
+
+                return getattr(left_operand, method_name)(right_operand)
+
+            return compare
+
+        return lambda frame: getattr(left(frame), method_name)(right(frame))
+
+    def compile_UnaryOperationNode(self, node, scope: Scope):
+        root = self.compile(node.get_root(), scope)
+        operator_name = node.get_operator()
+        return lambda frame: root(frame).unary_operation(operator_name)
+
+    # --------------- Miscellaneous --------------- :
+    def compile_CodeBlockNode(self, node, scope: Scope):
+        block_scope = self.resolver.get_scope(node)
+        if block_scope is None:  # nothing is declared in the block, so it doesn't need its own frame
+            return self.compile_statement(node.get_body(), scope)
+
+        body = self.compile_statement(node.get_body(), block_scope)
+
+        def run_block(frame: Frame):
+            return body(Frame(block_scope, frame))
+
+        return run_block
+
+    def compile_MultilineCodeNode(self, node, scope: Scope):
+        statements = tuple(
+            (self.compile(statement, scope), is_statement(statement)) for statement in node.get_nodes()
+        )
+
+        def run_statements(frame: Frame):
+            for statement, can_return in statements:
+                return_value = statement(frame)
+
+                # if a "return" statement is encountered:
+                if can_return and return_value is not None:
+                    return return_value
+
+        return run_statements
+
+    def compile_ReturnNode(self, node, scope: Scope):
+        if scope.top_level:
+            pos_x, pos_y = node.get_position()
+
+            def illegal_return(frame: Frame):
+                raise MCSSyntaxError(f"Illegal return statement (line {pos_y}, {pos_x})")
+
+            return illegal_return
+
+        if node.get_value() is None:
+            return lambda frame: MCS_NULL
+
+        return self.compile(node.get_value(), scope)  # value becomes the return value
+
+    def compile_EntitySelectorNode(self, node, scope: Scope):
+        # only relevant for compiler, so ignore everything but statement
+        return self.compile(node.get_statement(), scope)
+
+    # --------------- Error --------------- :
+    def compile_unknown(self, node, scope: Scope):
+        def unknown_node(frame: Frame):
+            raise MCSInterpreterError(f"Unknown node {node.__class__.__name__ !r}")
+
+        return unknown_node  # only an error if it is actually run
+
+    def __repr__(self) -> str:
+        return "ClosureCompiler()"
+
+
+def is_statement(node) -> bool:
+    if isinstance(node, EntitySelectorNode):
+        return is_statement(node.get_statement())
+
+    return isinstance(node, statement_nodes)
+
+
+def run_compiled(ast, resolver: Resolver = None, scheduler: TickScheduler = None) -> Frame:
+    builtins = SymbolTable(load_builtins=True).symbols
+    resolver = resolve_names(ast, builtins.keys()) if resolver is None else resolver
+    scheduler = TickScheduler() if scheduler is None else scheduler
+    scope, code = ClosureCompiler(resolver, scheduler=scheduler).compile_program(ast)
+
+    frame = Frame(scope)
+    for name, value in builtins.items():
+        frame.values[scope.slots[name]] = value
+
+    code(frame)
+    scheduler.run()  # async loops
+    return frame
@@ -1,6 +1,11 @@
 from ..errors import *
+from ..common import get_visit_method
+from ..parser.nodes import FunctionCallNode, VariableAccessNode
 from .types import *
-from .builtin_functions import builtin_functions
+from .builtin_functions import builtin_functions, custom_range, get_range_bound
+from .scheduler import TickScheduler
+
+empty_result = RuntimeResult()  # result of statements without a value (results are never modified, so it's shared)
 
 
 class SymbolTable:
@@ -26,37 +31,32 @@ class SymbolTable:
             self.declare(function_name, mcs_function)
 
     def get(self, name, *, generate_error: bool = True) -> any:
-        # Search for value in self
-        value = self.symbols.get(name)
-        if value is not None:
-            return value
-
-        # Check if parent is present
-        if self.parent is None:
-            if not generate_error:
-                return None
+        symbol_table = self
+        while symbol_table is not None:  # search for value in self, then in parents
+            value = symbol_table.symbols.get(name)
+            if value is not None:
+                return value
 
-            raise MCSNameError(f"Name {name !r} is not defined.")
+            symbol_table = symbol_table.parent
 
-        # Search for value in parent
-        value = self.parent.get(name, generate_error=False)
-        if generate_error and value is None:
+        if generate_error:
             raise MCSNameError(f"Name {name !r} is not defined.")
 
-        return value  # return value even if it is None since no error is to be generated
+        return None
 
     def set(self, name, new_value: any) -> None:
-        if self.symbols.get(name) is not None:
-            self.symbols[name] = new_value
-            return
+        symbol_table = self
+        while symbol_table is not None:
+            if symbol_table.symbols.get(name) is not None:
+                symbol_table.symbols[name] = new_value
+                return
 
-        if self.parent is None:
-            raise MCSNameError(f"Name {name !r} is not defined.")
+            symbol_table = symbol_table.parent
 
-        self.parent.set(name, new_value)
+        raise MCSNameError(f"Name {name !r} is not defined.")
 
     def declare(self, name, value: any = None) -> None:
-        value = value if value is not None else MCSNull()
+        value = value if value is not None else MCS_NULL
         self.symbols[name] = value
 
 
@@ -64,6 +64,7 @@ class InterpreterContext:
     def __init__(self, *, parent: "InterpreterContext" = None, top_level: bool = False):
         self.parent = parent
         self.top_level = top_level
+        self.reusable = True  # false once an async loop can still run in this context (or in a child of it)
         self.symbol_table = SymbolTable(
             parent.symbol_table if parent is not None else None,  # NOQA
             load_builtins=top_level
@@ -81,32 +82,43 @@ class InterpreterContext:
     def declare(self, name, value=None) -> None:
         self.symbol_table.declare(name, value)
 
+    def keep_alive(self) -> None:
+        context = self
+        while context is not None and context.reusable:
+            context.reusable = False
+            context = context.parent
+
+    def reuse(self, parent: "InterpreterContext") -> "InterpreterContext":
+        """
+        Empties a context that is no longer used, so that
+        it can be used again as a child of parent.
+        """
+        self.parent = parent
+        self.symbol_table.parent = parent.symbol_table
+        self.symbol_table.symbols.clear()
+        return self
+
     def __repr__(self) -> str:
         return f'InterpreterContext({self.parent !r}, {self.top_level !r})'
 
 
-class RuntimeResult:
-    def __init__(self, *, value: any = None, return_value: any = None):
-        self.value = value
-        self.return_value = return_value
-
-    def get_value(self) -> any:
-        return self.value
-
-    def get_return_value(self) -> any:
-        return self.return_value
-
-    def __repr__(self) -> str:
-        return f'RuntimeResult({self.value !r}, {self.return_value !r})'
+class Interpreter:
+    dispatch_table: dict[type, callable] = {}  # node type -> visit method, filled once per class
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch_table = {}  # subclasses can override visit methods
 
-class Interpreter:
+    def __init__(self, *, scheduler: TickScheduler = None):
+        self.frame_pool: list[InterpreterContext] = []  # contexts of finished function calls
+        self.scheduler = TickScheduler() if scheduler is None else scheduler  # runs the next iterations of async loops
 
     def visit(self, node, context: InterpreterContext) -> RuntimeResult:
-        method_name = f'visit_{node.__class__.__name__}'
-        method = getattr(self, method_name, self.visit_unknown)
+        method = self.dispatch_table.get(node.__class__)
+        if method is None:
+            method = self.dispatch_table[node.__class__] = get_visit_method(type(self), node.__class__)
 
-        return method(node, context)
+        return method(self, node, context)
 
     # --------------- Builtin Types --------------- :
     def visit_NumberNode(self, node, context: InterpreterContext) -> RuntimeResult:
@@ -131,7 +143,7 @@ class Interpreter:
         return RuntimeResult(value=end_value)
 
     def visit_NullNode(self, node, context: InterpreterContext) -> RuntimeResult:
-        value = MCSNull()
+        value = MCS_NULL
         return RuntimeResult(value=value)
 
     # --------------- Type Manipulation --------------- :
@@ -149,7 +161,7 @@ class Interpreter:
         iterable: MCSIterable = context.get(name)
         iterable.set_key(key, value)
 
-        return RuntimeResult()
+        return empty_result
 
     def visit_AttributeGetNode(self, node, context: InterpreterContext) -> RuntimeResult:
         root = self.visit(node.get_root(), context).get_value()
@@ -170,14 +182,14 @@ class Interpreter:
         value = self.visit(node.get_value(), context).get_value()
 
         context.declare(name, value)
-        return RuntimeResult()
+        return empty_result
 
     def visit_VariableSetNode(self, node, context: InterpreterContext) -> RuntimeResult:
         name = node.get_name()
         value = self.visit(node.get_value(), context).get_value()
 
         context.set(name, value)
-        return RuntimeResult()
+        return empty_result
 
     # --------------- Functions --------------- :
     def visit_DefineFunctionNode(self, node, context: InterpreterContext) -> RuntimeResult:
@@ -190,7 +202,7 @@ class Interpreter:
         if name is not None:
             context.declare(name, function)
 
-        return RuntimeResult()
+        return empty_result
 
     def visit_FunctionCallNode(self, node, context: InterpreterContext) -> RuntimeResult:
         root: RuntimeResult = self.visit(node.get_root(), context)
@@ -198,11 +210,35 @@ class Interpreter:
 
         args = [self.visit(arg_node, context).get_value() for arg_node in node.get_arguments()]
 
-        call_result: RuntimeResult = root.call(args, context)  # has no value, but return value
+        if root.__class__ is MCSFunction and root.body is not None:  # user defined function, run by this interpreter
+            call_result: RuntimeResult = self.call_function(root, args, context)
+        else:
+            call_result: RuntimeResult = root.call(args, context)  # has no value, but return value
 
         # functions as converters of return values into values
         return RuntimeResult(value=call_result.get_return_value())
 
+    def call_function(self, function: MCSFunction, arg_list: list, context: InterpreterContext) -> RuntimeResult:
+        if len(arg_list) != function.parameter_count:
+            raise MCSValueError(
+                f"Function {function.print_value()} takes {function.parameter_count} arguments, got {len(arg_list)}"
+            )
+
+        # functions see the names of their caller, so the context of a call only depends on the caller's context
+        local_context = self.frame_pool.pop().reuse(context) if self.frame_pool else InterpreterContext(parent=context)
+
+        # Add argument values to parameter names in local context (to make arguments work)
+        for parameter_name, argument in zip(function.parameter_names, arg_list):
+            local_context.declare(parameter_name, argument)
+
+        try:
+            result: RuntimeResult = self.visit(function.body, local_context)
+        finally:
+            if local_context.reusable:  # nothing refers to the context once the call has ended
+                self.frame_pool.append(local_context)
+
+        return result if result.get_return_value() is not None else RuntimeResult(return_value=MCS_NULL)
+
     # --------------- Conditionals --------------- :
     def visit_IfConditionNode(self, node, context: InterpreterContext) -> RuntimeResult:
         conditions: list[dict, ...] = node.get_conditions()
@@ -220,32 +256,75 @@ class Interpreter:
     def visit_WhileLoopNode(self, node, context: InterpreterContext) -> RuntimeResult:
         condition = node.get_condition()
         body = node.get_body()
+        iteration_count = 0
 
         local_context = InterpreterContext(parent=context, top_level=context.top_level)
-        while bool(self.visit(condition, local_context).get_value()) is True:
-            visit_value: RuntimeResult = self.visit(body, local_context)
-            if visit_value.get_return_value() is not None:
-                return visit_value  # already RuntimeResult, don't need to convert
+        try:
+            while bool(self.visit(condition, local_context).get_value()) is True:
+                iteration_count += 1
+                visit_value: RuntimeResult = self.visit(body, local_context)
+                if visit_value.get_return_value() is not None:
+                    return visit_value  # already RuntimeResult, don't need to convert
+        finally:
+            self.scheduler.count_iterations(node.get_position(), iteration_count)
 
     def visit_AsyncWhileLoopNode(self, node, context: InterpreterContext) -> RuntimeResult:
-        return self.visit_WhileLoopNode(node, context)  # works same as while loop in interpreter
+        # first iteration is run right away, the next ones are run by the scheduler (one per simulated tick)
+        local_context = InterpreterContext(parent=context, top_level=context.top_level)
+        local_context.keep_alive()
+
+        return self.run_async_iteration(node, local_context)
+
+    def run_async_iteration(self, node, local_context: InterpreterContext) -> RuntimeResult | None:
+        if bool(self.visit(node.get_condition(), local_context).get_value()) is not True:
+            return None
+
+        self.scheduler.count_iterations(node.get_position(), 1)
+        visit_value: RuntimeResult = self.visit(node.get_body(), local_context)
+        if visit_value.get_return_value() is not None:
+            return visit_value  # returning ends the loop, the next iteration is never scheduled
+
+        self.scheduler.schedule(node, lambda: self.run_async_iteration(node, local_context))
 
     def visit_ForLoopNode(self, node, context: InterpreterContext) -> RuntimeResult:
-        iterable = self.visit(node.get_iterable(), context).get_value()
         child_name = node.get_child_name()
         body = node.get_body()
+        iteration_count = 0
 
-        if iterable.is_iterable() is False:
-            raise MCSTypeError(f"{iterable.class_name() !r} object is not iterable")
+        py_values = self.get_range_values(node.get_iterable(), context)
+        if py_values is None:  # not a range, iterate over the values of the iterable
+            iterable = self.visit(node.get_iterable(), context).get_value()
+            if iterable.is_iterable() is False:
+                raise MCSTypeError(f"{iterable.class_name() !r} object is not iterable")
 
-        local_context = InterpreterContext(parent=context, top_level=context.top_level)
+            py_values = iterable.iter_values()
 
-        for py_value in iterable.get_value():
-            local_context.declare(child_name, py_value)
+        local_context = InterpreterContext(parent=context, top_level=context.top_level)
+        try:
+            for py_value in py_values:
+                local_context.declare(child_name, py_value)
+
+                iteration_count += 1
+                visit_value: RuntimeResult = self.visit(body, local_context)
+                if visit_value.get_return_value() is not None:
+                    return visit_value  # already RuntimeResult, don't need to convert
+        finally:
+            self.scheduler.count_iterations(node.get_position(), iteration_count)
+
+    def get_range_values(self, node, context: InterpreterContext):
+        """
+        Numbers of a range(...) call iterable, generated one by one instead of as a list
+        (None if the iterable isn't a call to the builtin range function).
+        """
+        if node.__class__ is not FunctionCallNode or node.get_root().__class__ is not VariableAccessNode:
+            return None  # only variable roots can be checked without running anything twice
+
+        function = context.get(node.get_root().get_name())
+        if function.call is not custom_range:
+            return None
 
-            visit_value: RuntimeResult = self.visit(body, local_context)
-            if visit_value.get_return_value() is not None:
-                return visit_value  # already RuntimeResult, don't need to convert
+        args = [self.visit(arg_node, context).get_value() for arg_node in node.get_arguments()]
+        return map(new_number, range(get_range_bound(args)))
 
     # --------------- Operations --------------- :
     def visit_BinaryOperationNode(self, node, context: InterpreterContext) -> RuntimeResult:
@@ -280,7 +359,7 @@ class Interpreter:
             if return_value is not None and return_value.get_return_value() is not None:
                 return return_value
 
-        return RuntimeResult()  # if no return statement is encountered
+        return empty_result  # if no return statement is encountered
 
     def visit_ReturnNode(self, node, context: InterpreterContext) -> RuntimeResult:
         if context.is_top_level():
@@ -288,7 +367,7 @@ class Interpreter:
             raise MCSSyntaxError(f"Illegal return statement (line {pos_y}, {pos_x})")
 
         if node.get_value() is None:
-            return RuntimeResult(return_value=MCSNull())
+            return RuntimeResult(return_value=MCS_NULL)
 
         return_value: RuntimeResult = self.visit(node.get_value(), context)
         return RuntimeResult(return_value=return_value.get_value())  # turn value into return value
@@ -300,3 +379,4 @@ class Interpreter:
     # --------------- Error --------------- :
     def visit_unknown(self, node, context: InterpreterContext):
         raise MCSInterpreterError(f"Unknown node {node.__class__.__name__ !r}")
+
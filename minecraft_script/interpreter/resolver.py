@@ -0,0 +1,237 @@
+from ..errors import MCSNameError
+from ..common import get_visit_method
+from ..parser.nodes import *
+
+GLOBAL_DEPTH = -1  # address depth of names that are only ever declared at the top level
+
+
+class Scope:
+    """
+    Compile-time scope: maps the names declared in a scope to slots
+    of the frames that are created for it at runtime.
+    """
+
+    def __init__(self, parent: "Scope" = None, *, top_level: bool = False, in_function: bool = False):
+        self.parent = parent  # None for function scopes (their names are looked up in the caller at runtime)
+        self.top_level = top_level
+        self.in_function = in_function
+        self.slots: dict[str, int] = {}
+        self.defined: set[str] = set()  # names whose declaration has already been run at this point of the code
+
+    def declare(self, name: str) -> int:
+        return self.slots.setdefault(name, len(self.slots))
+
+    def resolve(self, name: str) -> tuple[int, int] | None:
+        depth = 0
+        scope = self
+        while scope is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                return depth, slot
+
+            depth += 1
+            scope = scope.parent
+
+        return None  # not declared in the current function, only known at runtime
+
+    def is_defined(self, name: str) -> bool:
+        scope = self
+        while scope is not None:
+            if name in scope.defined:
+                return True
+            scope = scope.parent
+
+        return False
+
+    def __repr__(self) -> str:
+        return f"Scope({self.slots !r}, {self.top_level !r})"
+
+
+class Resolver:
+    """
+    Pass over the parser AST that gives every variable access a lexical address:
+    (depth, slot) of the frame that declares it, (GLOBAL_DEPTH, slot) for names
+    that only exist at the top level, or None if it can only be found at runtime
+    (functions see the names of their caller).
+
+    Names that can't be defined when they are used are reported before execution.
+    """
+    dispatch_table: dict[type, callable] = {}  # node type -> resolve method, filled once per class
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch_table = {}
+
+    def __init__(self, builtin_names: iter = ()):
+        self.builtin_names = tuple(builtin_names)
+        self.global_scope: Scope | None = None
+        self.scopes: dict[int, Scope] = {}  # id of a code block / for loop / function node -> its scope
+        self.local_names: set[str] = set()  # names that are declared anywhere but at the top level
+        self.errors: list[str] = []
+
+    def resolve_program(self, ast: ParserNode) -> "Resolver":
+        self.global_scope = Scope(top_level=True)
+        for name in self.builtin_names:
+            self.global_scope.declare(name)
+            self.global_scope.defined.add(name)
+
+        for name in declared_names(ast):
+            self.global_scope.declare(name)
+
+        collect_local_names(ast, self.local_names, is_top_level=True)
+        self.resolve(ast, self.global_scope)
+
+        if self.errors:
+            raise MCSNameError("\n".join(self.errors))
+
+        return self
+
+    def resolve(self, node, scope: Scope) -> None:
+        if isinstance(node, ParserNode):
+            method = self.dispatch_table.get(node.__class__)
+            if method is None:
+                method = self.dispatch_table[node.__class__] = get_visit_method(
+                    type(self), node.__class__, "resolve_", "resolve_children"
+                )
+
+            method(self, node, scope)
+
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                self.resolve(item, scope)
+
+        elif isinstance(node, dict):
+            for item in node.values():
+                self.resolve(item, scope)
+
+    def resolve_children(self, node: ParserNode, scope: Scope) -> None:
+        for slot in type(node).__slots__:
+            self.resolve(getattr(node, slot), scope)
+
+    def get_address(self, name: str, position: tuple[int, int], scope: Scope) -> tuple[int, int] | None:
+        if not scope.is_defined(name) and (not scope.in_function or not self.is_declared_anywhere(name)):
+            pos_x, pos_y = position
+            self.errors.append(f"Name {name !r} is not defined (line {pos_y}, {pos_x})")
+
+        address = scope.resolve(name)
+        if address is None and name not in self.local_names and name in self.global_scope.slots:
+            return GLOBAL_DEPTH, self.global_scope.slots[name]
+
+        return address
+
+    def is_declared_anywhere(self, name: str) -> bool:
+        return name in self.local_names or name in self.global_scope.slots
+
+    def get_scope(self, node: ParserNode) -> Scope | None:
+        return self.scopes.get(id(node))
+
+    # --------------- Variables --------------- :
+    def resolve_VariableAccessNode(self, node: VariableAccessNode, scope: Scope) -> None:
+        node.address = self.get_address(node.get_name(), node.get_position(), scope)
+
+    def resolve_VariableDeclareNode(self, node: VariableDeclareNode, scope: Scope) -> None:
+        self.resolve(node.get_value(), scope)  # value is evaluated before the name is declared
+        scope.declare(node.get_name())
+        scope.defined.add(node.get_name())
+
+    def resolve_VariableSetNode(self, node: VariableSetNode, scope: Scope) -> None:
+        self.resolve(node.get_value(), scope)
+        node.address = self.get_address(node.get_name(), node.get_position(), scope)
+
+    def resolve_SetKeyNode(self, node: SetKeyNode, scope: Scope) -> None:
+        self.resolve(node.get_key(), scope)
+        self.resolve(node.get_value(), scope)
+        node.address = self.get_address(node.get_name(), node.get_position(), scope)
+
+    # --------------- Scopes --------------- :
+    def resolve_DefineFunctionNode(self, node: DefineFunctionNode, scope: Scope) -> None:
+        function_scope = Scope(in_function=True)  # top level always false here
+        for parameter in node.get_parameter_names():
+            function_scope.declare(parameter)
+            function_scope.defined.add(parameter)
+
+        self.scopes[id(node)] = function_scope
+        self.resolve(node.get_body(), function_scope)
+
+        scope.declare(node.get_name())
+        scope.defined.add(node.get_name())
+
+    def resolve_CodeBlockNode(self, node: CodeBlockNode, scope: Scope) -> None:
+        names = declared_names(node.get_body())
+        if names:  # blocks that don't declare anything don't need a frame
+            block_scope = Scope(scope, top_level=scope.top_level, in_function=scope.in_function)
+            for name in names:
+                block_scope.declare(name)
+
+            self.scopes[id(node)] = block_scope
+            scope = block_scope
+
+        self.resolve(node.get_body(), scope)
+
+    def resolve_ForLoopNode(self, node: ForLoopNode, scope: Scope) -> None:
+        self.resolve(node.get_iterable(), scope)
+
+        loop_scope = Scope(scope, top_level=scope.top_level, in_function=scope.in_function)
+        loop_scope.declare(node.get_child_name())
+        loop_scope.defined.add(node.get_child_name())
+
+        self.scopes[id(node)] = loop_scope
+        self.resolve(node.get_body(), loop_scope)
+
+
+def declared_names(node) -> list[str]:
+    """
+    Names that are declared directly in the scope the node is run in
+    (declarations in nested code blocks or functions aren't included).
+    """
+    if isinstance(node, MultilineCodeNode):
+        return [name for statement in node.get_nodes() for name in declared_names(statement)]
+
+    if isinstance(node, (VariableDeclareNode, DefineFunctionNode)):
+        return [node.get_name()]
+
+    if isinstance(node, EntitySelectorNode):
+        return declared_names(node.get_statement())
+
+    return []
+
+
+def collect_local_names(node, names: set[str], *, is_top_level: bool = False) -> None:
+    if isinstance(node, MultilineCodeNode):
+        for statement in node.get_nodes():
+            collect_local_names(statement, names, is_top_level=is_top_level)
+
+    elif isinstance(node, VariableDeclareNode):
+        if not is_top_level:
+            names.add(node.get_name())
+        collect_local_names(node.get_value(), names)
+
+    elif isinstance(node, DefineFunctionNode):
+        if not is_top_level:
+            names.add(node.get_name())
+        names.update(node.get_parameter_names())
+        collect_local_names(node.get_body(), names)
+
+    elif isinstance(node, ForLoopNode):
+        names.add(node.get_child_name())
+        collect_local_names(node.get_iterable(), names)
+        collect_local_names(node.get_body(), names)
+
+    elif isinstance(node, EntitySelectorNode):
+        collect_local_names(node.get_statement(), names, is_top_level=is_top_level)
+
+    elif isinstance(node, ParserNode):
+        for slot in type(node).__slots__:
+            collect_local_names(getattr(node, slot), names)
+
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            collect_local_names(item, names)
+
+    elif isinstance(node, dict):
+        for item in node.values():
+            collect_local_names(item, names)
+
+
+def resolve_names(ast: ParserNode, builtin_names: iter = ()) -> Resolver:
+    return Resolver(builtin_names).resolve_program(ast)
@@ -0,0 +1,77 @@
+from ..common import COMMON_CONFIG
+from time import perf_counter
+
+
+class TickScheduler:
+    """
+    Simulated game ticks for `mcs debug`.
+
+    In a datapack, every iteration of an async while loop schedules the next one
+    a tick later ("schedule function ... 1t replace"). Loops that run at the same
+    time therefore take turns, once per tick. The program itself runs in tick 0,
+    then every tick runs the iterations that were scheduled during the previous one.
+    """
+
+    def __init__(self, *, tick_limit: int = None, tick_budget: int = None):
+        tick_limit = COMMON_CONFIG["debug_tick_limit"] if tick_limit is None else tick_limit
+        tick_budget = COMMON_CONFIG["debug_tick_budget"] if tick_budget is None else tick_budget
+
+        self.tick_limit = tick_limit if tick_limit > 0 else None  # 0 disables the limit
+        self.tick_budget = tick_budget / 1000  # milliseconds -> seconds
+        self.current_tick = 0
+        self.scheduled: dict[object, callable] = {}  # async loop -> its next iteration, in scheduling order
+
+        # ---- Profiling ---- :
+        self.loop_iterations: dict[tuple[int, int], int] = {}  # loop position -> iterations run
+        self.tick_times: list[float] = []  # seconds spent in every simulated tick
+        self.tick_iterations: list[int] = []  # loop iterations (nested loops included) run in every simulated tick
+
+    def schedule(self, loop, iteration: callable) -> None:
+        self.scheduled.pop(loop, None)  # "replace": a loop is only run once per tick, after the loops scheduled before it
+        self.scheduled[loop] = iteration
+
+    def count_iterations(self, position: tuple[int, int], iteration_count: int) -> None:
+        self.loop_iterations[position] = self.loop_iterations.get(position, 0) + iteration_count
+
+    def run(self) -> None:
+        while self.scheduled:
+            if self.current_tick == self.tick_limit:
+                print(f"Stopped simulation after {self.current_tick} ticks with {len(self.scheduled)} async while loop(s) "
+                      f"still running (see the \"debug_tick_limit\" setting)")
+                break
+
+            self.run_tick()
+
+        slow_ticks = [tick_time for tick_time in self.tick_times if tick_time > self.tick_budget]
+        if slow_ticks:
+            print(f"{len(slow_ticks)} tick(s) took longer than the {self.tick_budget * 1000 :g}ms budget "
+                  f"(slowest: {max(slow_ticks) * 1000: 0.1f}ms, see the \"debug_tick_budget\" setting)")
+
+    def run_tick(self) -> None:
+        due_iterations = self.scheduled
+        self.scheduled = {}  # iterations scheduled during this tick are run in the next one
+        self.current_tick += 1
+
+        start_iterations = sum(self.loop_iterations.values())
+        start_time = perf_counter()
+
+        for iteration in due_iterations.values():
+            iteration()
+
+        self.tick_times.append(perf_counter() - start_time)
+        self.tick_iterations.append(sum(self.loop_iterations.values()) - start_iterations)
+
+    def report(self) -> None:
+        for (pos_x, pos_y), iteration_count in sorted(self.loop_iterations.items(), key=lambda item: item[0][::-1]):
+            print(f"Loop (line {pos_y}, {pos_x}): {iteration_count} iterations")
+
+        if not self.tick_times:
+            return
+
+        slowest_tick = max(range(len(self.tick_times)), key=self.tick_times.__getitem__)
+        busiest_tick = max(range(len(self.tick_iterations)), key=self.tick_iterations.__getitem__)
+        print(f"Simulated ticks: {self.current_tick}, "
+              f"average {sum(self.tick_times) / len(self.tick_times) * 1000: 0.3f}ms and "
+              f"{sum(self.tick_iterations) / len(self.tick_iterations): 0.1f} loop iterations per tick")
+        print(f"Slowest tick: {slowest_tick + 1} ({self.tick_times[slowest_tick] * 1000: 0.3f}ms), "
+              f"busiest tick: {busiest_tick + 1} ({self.tick_iterations[busiest_tick]} loop iterations)")
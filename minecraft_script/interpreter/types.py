@@ -1,12 +1,53 @@
 from ..errors import *
+from operator import add, sub, mul, floordiv, mod, eq, lt, gt, le, ge
+
+create_object = object.__new__  # creates an instance without running its __new__ / __init__
 
 operation_lookup_table = {
     "&&": "logical_and",
     "||": "logical_or",
 }
 
+# python implementation of every operator (used instead of evaluating the operation as text):
+binary_operators = {
+    "+": add,
+    "-": sub,
+    "*": mul,
+    "//": floordiv,
+    "%": mod,
+}
+
+comparison_operators = {
+    "==": eq,
+    "<": lt,
+    ">": gt,
+    "<=": le,
+    ">=": ge,
+}
+
+SMALL_NUMBER_MIN, SMALL_NUMBER_MAX = -128, 1024  # numbers that share a single MCSNumber instance per value
+
+
+class RuntimeResult:
+    __slots__ = ('value', 'return_value')
+
+    def __init__(self, *, value: any = None, return_value: any = None):
+        self.value = value
+        self.return_value = return_value
+
+    def get_value(self) -> any:
+        return self.value
+
+    def get_return_value(self) -> any:
+        return self.return_value
+
+    def __repr__(self) -> str:
+        return f'RuntimeResult({self.value !r}, {self.return_value !r})'
+
 
 class MCSObject:
+    __slots__ = ()
+
     def get_value(self):
         raise MCSInterpreterError('Failed getting value of unknown Object')
 
@@ -35,7 +76,7 @@ class MCSObject:
     # ----------------- Operations  ----------------- :
     def _binary_operation(self, other, operator: str):
         if isinstance(other, self.__class__):
-            return MCSNumber(eval(f"self.value {operator} other.get_value()"))
+            return MCSNumber(binary_operators[operator](self.value, other.get_value()))
 
         raise self.operation_error(other, f'"{operator}"')
 
@@ -69,7 +110,7 @@ class MCSObject:
     # ----------------- Comparisons ----------------- :
     def _comparison_operation(self, other, comparator: str):
         try:
-            result = eval(f"self.get_value() {comparator} other.get_value()")
+            result = comparison_operators[comparator](self.get_value(), other.get_value())
         except TypeError as err:
             raise self.comparison_error(other, comparator) from err
         else:
@@ -109,39 +150,51 @@ class MCSObject:
 
 
 class MCSIterable(MCSObject):
-    def get_key(self, key: str) -> any:
-        try:
-            index = int(key)
-        except ValueError as err:
-            raise MCSTypeError(f'{self.class_name()} indices must be integers') from err
+    __slots__ = ()
 
-        return self.get_value()[index]
+    def get_key(self, key: str) -> any:
+        return self.get_value()[self.get_index(key)]
 
     def set_key(self, key: str, value: any) -> None:
-        try:
-            index = int(key)
-        except ValueError as err:
-            raise MCSTypeError(f'{self.class_name()} indices must be integers') from err
+        index = self.get_index(key)
 
         if index < len(self.get_value()):
             self.get_value()[index] = value
         else:
             self.get_value().insert(index, value)
 
+    def get_index(self, key) -> int:
+        try:
+            return int(key)
+        except ValueError as err:
+            raise MCSTypeError(f'{self.class_name()} indices must be integers') from err
+
     def is_iterable(self) -> bool:
         return True
 
+    def iter_values(self):
+        """Values a for loop iterates over"""
+        return self.get_value()
+
     # ----------------- Attributes ----------------- :
     def attribute_length(self) -> "MCSNumber":
         return MCSNumber(len(self.get_value()))
 
 
 class MCSNumber(MCSObject):
-    def __init__(self, value: int):
-        if not isinstance(value, int):
+    __slots__ = ('value',)
+
+    def __new__(cls, value: int):
+        if value.__class__ is int:
+            if SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:  # numbers are immutable, so small ones are shared
+                return small_numbers[value]
+        elif not isinstance(value, int):
             raise MCSInterpreterError(f"Expected type 'int', got {value.__class__.__name__ !r}")
 
-        self.value = value
+        instance = create_object(cls)
+        instance.value = value
+
+        return instance
 
     def get_value(self) -> int:
         return self.value
@@ -150,10 +203,71 @@ class MCSNumber(MCSObject):
         if operator == 'add':
             return self
         elif operator == 'subtract':
-            return MCSNumber(-self.value)  # Number with opposite value
+            return new_number(-self.value)  # Number with opposite value
 
         return super().unary_operation(operator)
 
+    # ----------------- Number Fast Paths ----------------- :
+    def add(self, other):
+        if other.__class__ is MCSNumber:
+            return new_number(self.value + other.value)
+
+        return self._binary_operation(other, '+')
+
+    def subtract(self, other):
+        if other.__class__ is MCSNumber:
+            return new_number(self.value - other.value)
+
+        return self._binary_operation(other, '-')
+
+    def multiply(self, other):
+        if other.__class__ is MCSNumber:
+            return new_number(self.value * other.value)
+
+        return self._binary_operation(other, '*')
+
+    def divide(self, other):
+        if other.__class__ is MCSNumber:
+            return new_number(self.value // other.value)
+
+        return self._binary_operation(other, '//')
+
+    def modulus(self, other):
+        if other.__class__ is MCSNumber:
+            return new_number(self.value % other.value)
+
+        return self._binary_operation(other, '%')
+
+    def equals(self, other):
+        if other.__class__ is MCSNumber:
+            return MCS_TRUE if self.value == other.value else MCS_FALSE
+
+        return self._comparison_operation(other, '==')
+
+    def less_than(self, other):
+        if other.__class__ is MCSNumber:
+            return MCS_TRUE if self.value < other.value else MCS_FALSE
+
+        return self._comparison_operation(other, '<')
+
+    def greater_than(self, other):
+        if other.__class__ is MCSNumber:
+            return MCS_TRUE if self.value > other.value else MCS_FALSE
+
+        return self._comparison_operation(other, '>')
+
+    def less_equals_than(self, other):
+        if other.__class__ is MCSNumber:
+            return MCS_TRUE if self.value <= other.value else MCS_FALSE
+
+        return self._comparison_operation(other, '<=')
+
+    def greater_equals_than(self, other):
+        if other.__class__ is MCSNumber:
+            return MCS_TRUE if self.value >= other.value else MCS_FALSE
+
+        return self._comparison_operation(other, '>=')
+
     # ----------------- Miscellaneous ----------------- :
     def __int__(self) -> int:
         return self.get_value()
@@ -163,11 +277,21 @@ class MCSNumber(MCSObject):
 
 
 class MCSBool(MCSObject):
-    def __init__(self, value: bool):
+    __slots__ = ('value',)
+    __instances: dict[bool, "MCSBool"] = {}
+
+    def __new__(cls, value: bool):
+        instance = cls.__instances.get(value) if value.__class__ is bool else None
+        if instance is not None:  # only one true and one false instance exist
+            return instance
+
         if not isinstance(value, bool):
             raise MCSInterpreterError(f"Expected type 'bool', got {value.__class__.__name__ !r}")
 
-        self.value = value
+        instance = cls.__instances[value] = super().__new__(cls)
+        instance.value = value
+
+        return instance
 
     def get_value(self) -> bool:
         return self.value
@@ -180,6 +304,15 @@ class MCSBool(MCSObject):
 
 
 class MCSNull(MCSObject):
+    __slots__ = ()
+    __instance: "MCSNull" = None
+
+    def __new__(cls):
+        if cls.__instance is None:  # MCSNull holds no data, so a single instance is shared
+            cls.__instance = super().__new__(cls)
+
+        return cls.__instance
+
     def get_value(self) -> None:
         return
 
@@ -189,7 +322,7 @@ class MCSNull(MCSObject):
     # ----------------- Operations ----------------- :
     def _binary_operation(self, other, operator: str):
         if isinstance(other, (MCSNumber, MCSNull)):
-            return MCSNumber(eval(f"0 {operator} other.get_value()"))
+            return MCSNumber(binary_operators[operator](0, other.get_value()))
 
         raise self.operation_error(other, repr(operator))
 
@@ -199,55 +332,153 @@ class MCSNull(MCSObject):
 
 
 class MCSString(MCSIterable, MCSObject):
+    """
+    Concatenated strings are kept as a list of parts (a rope) that is only joined when
+    the text is needed. Like list buffers, a list of parts can be shared: a string only
+    uses its first `part_count` parts, so concatenating appends to the parts in place.
+    """
+    __slots__ = ('value', 'parts', 'part_count', 'length')
+
     def __init__(self, value: str):
         if not isinstance(value, str):
             raise MCSInterpreterError(f"Expected type 'str', got {value.__class__.__name__ !r}")
-        self.value = value
+        self.value: str | None = value  # None until the parts are joined
+        self.parts: list[str] | None = None
+        self.part_count = 0
+        self.length = len(value)
 
     def get_value(self) -> str:
+        if self.value is None:
+            self.value = "".join(self.parts[:self.part_count]) if self.part_count != len(self.parts) else "".join(self.parts)
+
         return self.value
 
     def get_key(self, key: str) -> "MCSString":
         return MCSString(super().get_key(key))
 
+    def concatenate(self, other: "MCSString") -> "MCSString":
+        if self.parts is None or self.part_count != len(self.parts):  # parts after this string's belong to other strings
+            self.parts = [self.get_value()]
+            self.part_count = 1
+
+        self.parts.append(other.get_value())
+
+        result = create_object(MCSString)
+        result.value = None
+        result.parts = self.parts
+        result.part_count = self.part_count + 1
+        result.length = self.length + other.length
+
+        return result
+
+    # ----------------- Attributes ----------------- :
+    def attribute_length(self) -> "MCSNumber":
+        return new_number(self.length)
+
     # ----------------- Operations ----------------- :
     def _binary_operation(self, other, operator: str):
         if operator in ('//', '%'):  # invalid operations
             raise self.operation_error(other, operator)
 
+        if operator == '+' and isinstance(other, MCSString):
+            return self.concatenate(other)
+
         if isinstance(other, MCSString if operator in ('+', '-') else (MCSNumber, MCSNull)):
-            return MCSString(eval(f"self.value {operator} other.get_value()"))
+            return MCSString(binary_operators[operator](self.get_value(), other.get_value()))
 
         raise self.operation_error(other, operator)
 
     # ----------------- Miscellaneous ----------------- :
+    def __bool__(self):
+        return self.length > 0
+
     def __repr__(self) -> str:
-        return f"MCSString({self.value !r})"
+        return f"MCSString({self.get_value() !r})"
 
 
 class MCSList(MCSIterable, MCSObject):
-    def __init__(self, value: list | tuple):
-        if not isinstance(value, (list, tuple)):
+    """
+    Lists only use the first `length` items of their buffer, so that a buffer can be
+    shared: concatenating extends the buffer of the left list in place if no other list
+    has added items to it, and buffers are copied before shared items are modified.
+    Lists created by range() use a python range as buffer until they are modified.
+    """
+    __slots__ = ('items', 'length', 'shared')
+
+    def __init__(self, value: list | tuple | range):
+        if not isinstance(value, (list, tuple, range)):
             raise MCSInterpreterError(f"Expected type 'list' or 'tuple', got {value.__class__.__name__ !r}")
 
-        self.value = list(value)
+        self.items: list | range = value if value.__class__ in (list, range) else list(value)  # lists aren't copied
+        self.length = len(value)
+        self.shared = False  # true if other lists can see the items of the buffer
 
     def get_value(self) -> list:
-        return self.value
+        # the returned list must not be modified (use append or set_key)
+        if self.items.__class__ is range or self.length != len(self.items):
+            self.own_items()
+
+        return self.items
+
+    def own_items(self) -> None:
+        if self.items.__class__ is range:
+            self.items = list(map(new_number, self.items))
+        else:
+            self.items = self.items[:self.length]
+
+        self.shared = False
+
+    def get_key(self, key) -> any:
+        index = self.get_index(key)
+        if index < 0:
+            index += self.length
+
+        if not 0 <= index < self.length:
+            raise IndexError("list index out of range")
+
+        item = self.items[index]
+        return item if self.items.__class__ is not range else new_number(item)
+
+    def set_key(self, key, value: any) -> None:
+        index = self.get_index(key)
+
+        if index < self.length:
+            if self.shared or self.items.__class__ is range or self.length != len(self.items):
+                self.own_items()  # copy on write
+
+            self.items[index] = value
+        else:
+            self.append(value)
+
+    def append(self, value: any) -> None:
+        if self.items.__class__ is range or self.length != len(self.items):
+            self.own_items()  # items after this list's items belong to other lists
+
+        self.items.append(value)
+        self.length += 1
+
+    def iter_values(self):
+        index = 0
+        while index < self.length:  # items appended while iterating are also iterated over
+            item = self.items[index]  # buffer can be replaced while iterating (copy on write)
+            yield item if self.items.__class__ is not range else new_number(item)
+            index += 1
 
     def print_value(self) -> str:
-        return f"[{', '.join(value.repr_value() for value in self.value)}]"
+        return f"[{', '.join(value.repr_value() for value in self.iter_values())}]"
 
     # ----------------- Attributes ----------------- :
+    def attribute_length(self) -> "MCSNumber":
+        return new_number(self.length)
+
     def attribute_append(self) -> "MCSFunction":
         def fnc_call(call_args: list, context):
-            from .interpreter import RuntimeResult
             if len(call_args) != 1:
                 raise MCSTypeError(f"Function <List.append> takes 1 argument, got {len(call_args)}")
 
-            self.value.append(call_args[0])  # append value to list
+            self.append(call_args[0])  # append value to list
 
-            return RuntimeResult(return_value=MCSNull())
+            return RuntimeResult(return_value=MCS_NULL)
 
         fnc = MCSFunction("List.append", None, None)
         fnc.call = fnc_call
@@ -260,20 +491,50 @@ class MCSList(MCSIterable, MCSObject):
             raise self.operation_error(other, operator)
 
         if isinstance(other, MCSList):
-            return MCSList(self.value + other.get_value())
+            return self.concatenate(other)
 
         raise self.operation_error(other, operator)
 
+    def concatenate(self, other: "MCSList") -> "MCSList":
+        other_items = other.get_value()  # read first, other can be self
+
+        if self.items.__class__ is range or self.length != len(self.items):
+            self.own_items()  # items after this list's items belong to other lists
+
+        self.items.extend(other_items)  # self only uses its first `length` items, so it doesn't change
+        result = MCSList(self.items)
+        result.shared = self.shared = True
+
+        return result
+
+    # ----------------- Comparisons ----------------- :
+    def equals(self, other):
+        # items are compared by value (not by identity, which depends on which numbers are shared)
+        if not isinstance(other, MCSList) or self.length != other.length:
+            return MCS_FALSE
+
+        for item, other_item in zip(self.iter_values(), other.iter_values()):
+            if not item.equals(other_item):
+                return MCS_FALSE
+
+        return MCS_TRUE
+
     # ----------------- Miscellaneous ----------------- :
+    def __bool__(self):
+        return self.length > 0
+
     def __repr__(self) -> str:
-        return f'MCSList({self.value !r})'
+        return f'MCSList({self.get_value() !r})'
 
 
 class MCSFunction(MCSObject):
+    __slots__ = ('name', 'body', 'parameter_names', 'parameter_count', '__dict__')  # builtins replace call / print_value per instance
+
     def __init__(self, name: str, body, parameter_names: tuple[str, ...]):
         self.name = name if name is not None else "anonymous function"
         self.body = body
         self.parameter_names = parameter_names
+        self.parameter_count = len(parameter_names) if parameter_names is not None else None  # checked on every call
 
     def get_value(self):
         raise MCSInterpreterError("Can't get value of function")
@@ -284,21 +545,36 @@ class MCSFunction(MCSObject):
     def repr_value(self) -> str:
         return self.print_value()
 
-    def call(self, arg_list: list | None, context):
-        from .interpreter import Interpreter, InterpreterContext, RuntimeResult
-        local_interpreter = Interpreter()
-        local_context = InterpreterContext(parent=context)  # top level always false here
+    def call(self, arg_list: list | None, context, interpreter=None):
+        if interpreter is None:  # called from outside an interpreter
+            from .interpreter import Interpreter
+            interpreter = Interpreter()
 
-        if len(arg_list) != len(self.parameter_names):
-            raise MCSValueError(f"Function {self.print_value()} takes {len(self.parameter_names)} arguments, got {len(arg_list)}")
+        return interpreter.call_function(self, arg_list, context)
 
-        # Add argument values to parameter names in local context (to make arguments work)
-        for i in range(len(self.parameter_names)):
-            local_context.declare(self.parameter_names[i], arg_list[i])
+    def __repr__(self) -> str:
+        return f"MCSFunction({self.name !r}, {self.parameter_names !r})"
 
-        result: RuntimeResult = local_interpreter.visit(self.body, local_context)
 
-        return result if result.get_return_value() is not None else RuntimeResult(return_value=MCSNull())
+# ----------------- Shared Instances ----------------- :
+MCS_TRUE = MCSBool(True)
+MCS_FALSE = MCSBool(False)
+MCS_NULL = MCSNull()
 
-    def __repr__(self) -> str:
-        return f"MCSFunction({self.name !r}, {self.parameter_names !r})"
+small_numbers: dict[int, MCSNumber] = {}
+for _value in range(SMALL_NUMBER_MIN, SMALL_NUMBER_MAX + 1):
+    small_numbers[_value] = create_object(MCSNumber)
+    small_numbers[_value].value = _value
+
+
+def new_number(value: int) -> MCSNumber:
+    """
+    Same as MCSNumber(value) for values that are
+    already known to be ints (skips the type check).
+    """
+    instance = small_numbers.get(value)
+    if instance is None:
+        instance = create_object(MCSNumber)
+        instance.value = value
+
+    return instance
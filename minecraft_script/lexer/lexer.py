@@ -1,4 +1,7 @@
 from json import loads
+from sys import intern
+from typing import Iterator
+from re import compile as re_compile, escape as re_escape
 from .tokens import Token
 from ..errors import MCSIllegalCharacterError, MCSSyntaxError
 from ..common import module_folder
@@ -22,161 +25,177 @@ token_type_chars = {
     token_type: [char["char"] for char in chars] for (token_type, chars) in LANG_TOKENS.items() if token_type[0] != '_'
 }
 
+# variant of every token value (first match in the token type the value resolves to):
+token_variant_table = {
+    char: next((char_obj.get("variant") for char_obj in LANG_TOKENS[token_type] if char_obj.get("char") == char), None)
+    for char, token_type in token_lookup_table.items()
+}
+
+# ---------------- Character class tables ---------------- :
+IGNORE_CHARS = frozenset(token_type_chars['TT_IGNORE'])
+NUMBER_CHARS = frozenset(token_type_chars['TT_NUMBER'])
+NAME_CHARS = frozenset(token_type_chars['TT_NAME'])
+NAME_EXTEND_CHARS = NAME_CHARS | frozenset(LANG_TOKENS['_TT_NAME_extend'])
+QUOTE_CHARS = frozenset(token_type_chars['TT_QUOTE'])
+AT_CHARS = frozenset(token_type_chars['TT_AT'])
+COMMENT_STRINGS = frozenset(token_type_chars['TT_COMMENT'])
+
+
+def _char_class_pattern(chars: frozenset):
+    return re_compile(f"[{''.join(map(re_escape, sorted(chars)))}]+")
+
+
+number_pattern = _char_class_pattern(NUMBER_CHARS)
+name_pattern = _char_class_pattern(NAME_EXTEND_CHARS)
+
 
 class Lexer:
     def __init__(self, code_input: str):
         self.code_input = code_input
-        self.current_index = -1
-        self.current_char = None
-        self.position_x = 0
+        self.code_length = len(code_input)
+        self.current_index = 0
+        self.line_start = -1  # index of the last newline before current_index
         self.position_y = 1
         self.__token_list = []
 
-        self.advance()  # initialize current_char and current_index to correct values
+    @property
+    def current_char(self) -> str | None:
+        return self.code_input[self.current_index] if self.current_index < self.code_length else None
 
-    def advance(self):
-        if self.current_index >= len(self.code_input) - 1:  # if index is equal to len - 1, don't advance
-            self.current_char = None
-            return
+    @property
+    def next_char(self) -> str | None:
+        # the last character of the input is never used as a lookahead character
+        return self.code_input[self.current_index + 1] if self.current_index < self.code_length - 2 else None
 
-        self.current_index += 1
-        self.current_char = self.code_input[self.current_index]
+    def get_position(self, index: int) -> tuple[int, int]:
+        if self.code_input[index] == '\n':  # newlines count as the start of the next line
+            return 0, self.position_y + 1
 
-        # Keep track of position
-        if self.current_char == '\n':
-            self.position_x = 0
-            self.position_y += 1
-        else:
-            self.position_x += 1
+        return index - self.line_start, self.position_y
 
-    @property
-    def next_char(self) -> str | None:
-        return self.code_input[self.current_index + 1] if self.current_index < len(self.code_input) - 2 else None
+    def track_newlines(self, start: int, end: int) -> None:
+        newline_count = self.code_input.count('\n', start, end)
+        if newline_count:
+            self.position_y += newline_count
+            self.line_start = self.code_input.rfind('\n', start, end)
 
     # ---------------- Special cases ---------------- :
-    def make_number(self) -> Token:
-        number = self.current_char
-        position = (self.position_x, self.position_y)
-        self.advance()
+    def skip_comment(self) -> None:
+        end = self.code_input.find('\n', self.current_index + 2)  # skip everything until newline
+        self.current_index = end if end != -1 else self.code_length
 
-        while self.current_char in token_type_chars['TT_NUMBER']:
-            number += self.current_char
-            self.advance()
+    def make_number(self) -> Token:
+        start = self.current_index
+        self.current_index = number_pattern.match(self.code_input, start).end()
 
-        return Token(number, 'TT_NUMBER', position)
+        return Token(self.code_input[start:self.current_index], 'TT_NUMBER', self.get_position(start))
 
     def make_name(self) -> Token:
-        name = self.current_char
-        position = (self.position_x, self.position_y)
-        self.advance()
-
-        while self.current_char in token_type_chars['TT_NAME'] + LANG_TOKENS['_TT_NAME_extend']:
-            name += self.current_char
-            self.advance()
+        start = self.current_index
+        self.current_index = name_pattern.match(self.code_input, start).end()
+        name = intern(self.code_input[start:self.current_index])  # names repeat a lot, share a single string
 
         reserved_name = LANG_KEYWORDS.get(name)
         if reserved_name is not None:  # if a name is reserved, update
-            return Token(name, reserved_name, position)
+            return Token(name, reserved_name, self.get_position(start))
 
-        return Token(name, 'TT_NAME', position)  # generic variable name
+        return Token(name, 'TT_NAME', self.get_position(start))  # generic variable name
 
     def make_string(self) -> Token:
-        string_quote = self.current_char  # store quote type to know when to stop string
-        string = ""
-        position = (self.position_x, self.position_y)  # store position since token gets starting pos of string
-        self.advance()
-
-        while self.current_char is not None and self.current_char != string_quote:
-            string += self.current_char
-            self.advance()
+        start = self.current_index
+        position = self.get_position(start)  # token gets starting pos of string
+        end = self.code_input.find(self.code_input[start], start + 1)  # string ends on the same quote type
 
-        if self.current_char is None:
+        if end == -1:
             raise MCSSyntaxError(f'Unmatched string starting at line {position[1]}, {position[0]}')
-        self.advance()  # skip closing string quote
 
-        return Token(string, 'TT_STRING', position)
+        self.track_newlines(start, end)
+        self.current_index = end + 1  # skip closing string quote
 
-    def make_entity_selector(self) -> Token:
-        selector = self.current_char  # should be "@" char
-        self.advance()
+        return Token(self.code_input[start + 1:end], 'TT_STRING', position)
 
-        position = self.position_x, self.position_y
+    def make_entity_selector(self) -> Token:
+        code = self.code_input
+        start = self.current_index  # should be "@" char
+        position = self.get_position(start + 1 if start + 1 < self.code_length else start)
         depth = 0
 
-        while self.current_char is not None and not (depth == 0 and self.current_char == ' '):
-            if self.current_char == '[':
+        index = start + 1
+        while index < self.code_length and not (depth == 0 and code[index] == ' '):
+            if code[index] == '[':
                 depth += 1
-            elif self.current_char == ']':
+            elif code[index] == ']':
                 depth -= 1
 
             if depth < 0:
                 raise MCSSyntaxError(f'Malformed entity selector at line {position[1]}, {position[0]}')
 
-            selector += self.current_char
-            self.advance()
+            index += 1
 
-        if self.current_char is None:
+        if index >= self.code_length:
             raise MCSSyntaxError(f'Malformed entity selector at line {position[1]}, {position[0]}')
-        self.advance()  # skip space (is going to get skipped anyway)
 
-        return Token(selector, 'TT_SELECTOR', position)
+        self.track_newlines(start, index)
+        self.current_index = index + 1  # skip space (is going to get skipped anyway)
+
+        return Token(code[start:index], 'TT_SELECTOR', position)
 
     # ---------------- Main implementation (turning code into tokens) ---------------- :
-    def default_tokenize_treatment(self) -> None:
-        position = (self.position_x, self.position_y)
+    def default_tokenize_treatment(self) -> Token:
+        index = self.current_index
+        position = self.get_position(index)
 
-        advance_needed = True if self.next_char is not None else False  # If token is composed, advance is needed
-        token_value = self.current_char + self.next_char if self.next_char is not None else self.current_char
+        token_value = self.code_input[index:index + 2] if index < self.code_length - 2 else None
         token_type = token_lookup_table.get(token_value)  # try with composed token first (priority to composed tokens)
 
         if token_type is None:  # check if composed token exists
-            advance_needed = False  # only 1 char, no advance needed
-            token_value = self.current_char
+            token_value = self.code_input[index]  # only 1 char
             token_type = token_lookup_table.get(token_value)
 
             if token_type is None:  # no composed token and no simple token
                 raise MCSIllegalCharacterError(token_value, position)
 
-        if advance_needed:
-            self.advance()
+        self.current_index += len(token_value)
 
-        # Check for variants (to add information to token):
-        variant = None
-        for char_dict in LANG_TOKENS[token_type]:
-            if char_dict.get("char") == token_value:
-                variant = char_dict.get("variant")  # if no variant, default to None
-                break  # if you get a match, don't need to continue searching
+        return Token(token_value, token_type, position, token_variant_table[token_value])
 
-        token = Token(token_value, token_type, position, variant)
-        self.__token_list.append(token)
-        self.advance()
+    def iter_tokens(self) -> Iterator[Token]:
+        if self.__token_list:  # already tokenized, reuse tokens
+            yield from self.__token_list
+            return
 
-    def tokenize(self) -> tuple[Token, ...]:
-        if self.__token_list:
-            return tuple(self.__token_list)
+        code = self.code_input
 
-        while self.current_char is not None:
-            if self.current_char in token_type_chars['TT_IGNORE']:
-                self.advance()
+        while self.current_index < self.code_length:
+            current_char = code[self.current_index]
 
-            elif self.current_char in token_type_chars['TT_NUMBER']:
-                self.__token_list.append(self.make_number())
+            if current_char in IGNORE_CHARS:
+                if current_char == '\n':  # keep track of position
+                    self.position_y += 1
+                    self.line_start = self.current_index
+                self.current_index += 1
 
-            elif self.current_char in token_type_chars['TT_NAME']:
-                self.__token_list.append(self.make_name())
+            elif current_char in NUMBER_CHARS:
+                yield self.make_number()
 
-            elif self.current_char in token_type_chars['TT_QUOTE']:
-                self.__token_list.append(self.make_string())
+            elif current_char in NAME_CHARS:
+                yield self.make_name()
 
-            elif self.current_char in token_type_chars['TT_AT']:
-                self.__token_list.append(self.make_entity_selector())
+            elif current_char in QUOTE_CHARS:
+                yield self.make_string()
 
-            elif self.next_char is not None and self.current_char + self.next_char in token_type_chars['TT_COMMENT']:
-                self.advance()  # skip second "/" (self.next_char)
-                while self.current_char is not None and self.current_char != "\n":
-                    self.advance()  # skip everything until newline (it's a comment)
+            elif current_char in AT_CHARS:
+                yield self.make_entity_selector()
+
+            elif self.next_char is not None and code[self.current_index:self.current_index + 2] in COMMENT_STRINGS:
+                self.skip_comment()
 
             else:
-                self.default_tokenize_treatment()
+                yield self.default_tokenize_treatment()
+
+    def tokenize(self) -> tuple[Token, ...]:
+        if self.__token_list:
+            return tuple(self.__token_list)
 
+        self.__token_list.extend(self.iter_tokens())
         return tuple(self.__token_list)
@@ -1,4 +1,6 @@
 class Token:
+    __slots__ = ('value', 'tt_type', 'position', 'variant')
+
     def __init__(self, value: any, tt_type: str, position: tuple[int, int] = None, variant: str = None):
         self.value = value
         self.tt_type = tt_type
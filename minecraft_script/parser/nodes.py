@@ -6,10 +6,12 @@ class ParserNode:
     ParserNode class that implements all parser nodes.
     Purely used for encapsulation/categorising.
     """
-    pass
+    __slots__ = ()
 
 
 class NumberNode(ParserNode):
+    __slots__ = ('value',)
+
     def __init__(self, value: Token):
         self.value = value
 
@@ -24,6 +26,8 @@ class NumberNode(ParserNode):
 
 
 class StringNode(ParserNode):
+    __slots__ = ('value',)
+
     def __init__(self, value: Token):
         self.value = value
 
@@ -38,6 +42,8 @@ class StringNode(ParserNode):
 
 
 class ListNode(ParserNode):
+    __slots__ = ('node_list', 'position')
+
     def __init__(self, node_list: list[ParserNode, ...], position: tuple[int, int]):
         self.node_list = node_list
         self.position = position
@@ -53,6 +59,8 @@ class ListNode(ParserNode):
 
 
 class BooleanNode(ParserNode):
+    __slots__ = ('value',)
+
     def __init__(self, value: Token):
         self.value = value
 
@@ -67,16 +75,25 @@ class BooleanNode(ParserNode):
 
 
 class NullNode(ParserNode):
-    def __init__(self):
-        pass
+    __slots__ = ()
+    __instance: "NullNode" = None
+
+    def __new__(cls):
+        if cls.__instance is None:  # NullNode holds no data, so a single instance is shared
+            cls.__instance = super().__new__(cls)
+
+        return cls.__instance
 
     def __repr__(self):
         return f'NullNode()'
 
 
 class VariableAccessNode(ParserNode):
+    __slots__ = ('name', 'address')
+
     def __init__(self, name: Token):
         self.name = name
+        self.address: tuple[int, int] | None = None  # set by the name resolver
 
     def get_name(self) -> str:
         return self.name.value  # extract value from token
@@ -89,6 +106,8 @@ class VariableAccessNode(ParserNode):
 
 
 class VariableDeclareNode(ParserNode):
+    __slots__ = ('name', 'value')
+
     def __init__(self, name: Token, value: ParserNode = None):
         self.name = name
         self.value = value  # Node or None
@@ -104,10 +123,13 @@ class VariableDeclareNode(ParserNode):
 
 
 class VariableSetNode(ParserNode):
+    __slots__ = ('name', 'position', 'value', 'address')
+
     def __init__(self, name: Token, value: ParserNode, position: tuple[int, int]):
         self.name = name
         self.position = position
         self.value = value
+        self.address: tuple[int, int] | None = None  # set by the name resolver
 
     def get_name(self) -> str:
         return self.name.value  # extract value out of name
@@ -123,6 +145,8 @@ class VariableSetNode(ParserNode):
 
 
 class BinaryOperationNode(ParserNode):
+    __slots__ = ('left_value', 'operator', 'right_value')
+
     def __init__(self, left_value: ParserNode, operator: Token, right_value: ParserNode):
         self.left_value = left_value  # Node
         self.operator = operator  # Token
@@ -145,6 +169,8 @@ class BinaryOperationNode(ParserNode):
 
 
 class GetKeyNode(ParserNode):
+    __slots__ = ('atom', 'key')
+
     def __init__(self, atom: ParserNode, key: ParserNode):
         self.atom = atom
         self.key = key
@@ -160,10 +186,13 @@ class GetKeyNode(ParserNode):
 
 
 class SetKeyNode(ParserNode):
+    __slots__ = ('name', 'key', 'value', 'address')
+
     def __init__(self, name: Token, key: ParserNode, value: ParserNode):
         self.name = name  # Token
         self.key = key  # Node
         self.value = value  # Node
+        self.address: tuple[int, int] | None = None  # set by the name resolver
 
     def get_name(self) -> str:
         return self.name.value
@@ -182,6 +211,8 @@ class SetKeyNode(ParserNode):
 
 
 class CodeBlockNode(ParserNode):
+    __slots__ = ('body', 'position')
+
     def __init__(self, body: ParserNode, position: tuple[int, int]):
         self.body = body
         self.position = position
@@ -197,6 +228,8 @@ class CodeBlockNode(ParserNode):
 
 
 class MultilineCodeNode(ParserNode):
+    __slots__ = ('statements', 'position')
+
     def __init__(self, statements: tuple[ParserNode, ...], position: tuple[int, int]):
         self.statements = statements
         self.position = position
@@ -212,6 +245,8 @@ class MultilineCodeNode(ParserNode):
 
 
 class ReturnNode(ParserNode):
+    __slots__ = ('value', 'position')
+
     def __init__(self, value: ParserNode, position: tuple[int, int]):
         self.value = value
         self.position = position
@@ -227,6 +262,8 @@ class ReturnNode(ParserNode):
 
 
 class DefineFunctionNode(ParserNode):
+    __slots__ = ('name', 'body', 'parameter_names', 'position')
+
     def __init__(self, name: Token, body: ParserNode, parameter_names: list[Token, ...], position: tuple[int, int]):
         self.name = name
         self.body = body
@@ -250,6 +287,8 @@ class DefineFunctionNode(ParserNode):
 
 
 class FunctionCallNode(ParserNode):
+    __slots__ = ('root_node', 'arguments', 'position')
+
     def __init__(self, root_node: ParserNode, arguments: list[ParserNode, ...], position: tuple[int, int]):
         self.root_node = root_node
         self.arguments = arguments
@@ -269,6 +308,8 @@ class FunctionCallNode(ParserNode):
 
 
 class IfConditionNode(ParserNode):
+    __slots__ = ('condition_list', 'position')
+
     def __init__(self, condition_list: list[dict, ...], position: tuple[int, int]):
         self.condition_list = condition_list
         self.position = position
@@ -284,6 +325,8 @@ class IfConditionNode(ParserNode):
 
 
 class UnaryOperationNode(ParserNode):
+    __slots__ = ('operator', 'root', 'position')
+
     def __init__(self, operator: str, root: ParserNode, position: tuple[int, int]):
         self.operator: str = operator
         self.root = root
@@ -303,6 +346,8 @@ class UnaryOperationNode(ParserNode):
 
 
 class WhileLoopNode(ParserNode):
+    __slots__ = ('condition', 'body', 'position')
+
     def __init__(self, condition: ParserNode, body: ParserNode, position: tuple[int, int]):
         self.condition = condition
         self.body = body
@@ -322,6 +367,8 @@ class WhileLoopNode(ParserNode):
 
 
 class AsyncWhileLoopNode(ParserNode):
+    __slots__ = ('condition', 'body', 'position')
+
     def __init__(self, condition: ParserNode, body: ParserNode, position: tuple[int, int]):
         self.condition = condition
         self.body = body
@@ -341,6 +388,8 @@ class AsyncWhileLoopNode(ParserNode):
 
 
 class ForLoopNode(ParserNode):
+    __slots__ = ('iterable', 'child_name', 'body', 'position')
+
     def __init__(self, iterable: ParserNode, child_name: Token, body: ParserNode, position: tuple[int, int]):
         self.iterable = iterable
         self.child_name = child_name
@@ -364,6 +413,8 @@ class ForLoopNode(ParserNode):
 
 
 class AttributeGetNode(ParserNode):
+    __slots__ = ('root', 'name')
+
     def __init__(self, root: ParserNode, name: Token):
         self.root = root
         self.name = name
@@ -382,6 +433,8 @@ class AttributeGetNode(ParserNode):
 
 
 class EntitySelectorNode(ParserNode):
+    __slots__ = ('selector', 'statement', 'position')
+
     def __init__(self, selector: str, statement: ParserNode, position: tuple[int, int]):
         self.selector = selector
         self.statement = statement
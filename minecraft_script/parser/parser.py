@@ -1,14 +1,22 @@
+from collections import deque
+from itertools import chain
+from typing import Iterable, Iterator
 from ..lexer.tokens import Token
 from ..errors import *
 from .nodes import *
 
 
 class Parser:
-    def __init__(self, token_input: tuple[Token, ...]):
-        self.token_input = token_input + (Token(';', 'TT_NEWLINE'),)  # add a newline at the end
+    def __init__(self, token_input: Iterable[Token]):
+        # tokens are consumed lazily; add a newline at the end
+        self.token_stream: Iterator[Token] = chain(token_input, (Token(';', 'TT_NEWLINE'),))
         self.__current_token: Token = None  # NOQA (Only None until the self.advance() call)
         self.current_index = -1
 
+        # lookahead buffer (single step back for self.revert()):
+        self.__token_history: deque[Token] = deque(maxlen=2)  # tokens as read from the stream (not overwritten)
+        self.__reverted_tokens: list[Token] = []
+
         self.parse_result = None
 
         self.advance()  # initialize token & index
@@ -21,16 +29,22 @@ class Parser:
         self.__current_token = __new
 
     def advance(self) -> None:
-        if self.current_index >= len(self.token_input) - 1:
+        token = self.__reverted_tokens.pop() if self.__reverted_tokens else next(self.token_stream, None)
+        if token is None:
             self.__current_token = None
             return
 
         self.current_index += 1
-        self.__current_token = self.token_input[self.current_index]
+        self.__token_history.append(token)
+        self.__current_token = token
 
     def revert(self) -> None:
-        self.current_index -= 2
-        self.advance()
+        if len(self.__token_history) < 2:
+            raise MCSParserError("Can't revert parser further than a single token")
+
+        self.current_index -= 1
+        self.__reverted_tokens.append(self.__token_history.pop())
+        self.__current_token = self.__token_history[-1]
 
     def raise_error(self, details: str, *, error=MCSSyntaxError, token: Token = None, include_pos: bool = True) -> None:
         token = self.current_token if token is None else token
@@ -2,6 +2,7 @@ from . import debug_code
 from .compiler import build_datapack
 from .common import COMMON_CONFIG, version
 from .config_utils import update_config, reset_config
+from .ast_cache import clear_cache
 import os.path
 
 
@@ -25,11 +26,33 @@ sh_help_message = """
 - help: displays this page!
     
 - debug <path>: debug the minecraft script file found at the given path.
+The program is compiled into Python closures before it is run; set the
+"debug_engine" setting to "tree" to use the (slower) tree-walking interpreter.
+Async while loops run one iteration per simulated game tick, like in the
+datapack. The simulation stops after "debug_tick_limit" ticks (0 disables the
+limit); ticks that take longer than "debug_tick_budget" milliseconds are
+reported. If the "debug_loop_report" setting is enabled, the number of
+iterations run by every loop and the time spent per tick are shown once the
+program has ended.
     
 - compile <path> [<datapack name>] [<output path>]: compile the associated
 mcs file into a datapack. The resulting datapack folder will be named after
 the mcs file, unless a datapack name is specified. The output path argument
 specifies where the datapack should be generated (default to current path).
+If the "incremental_build" setting is enabled, an existing datapack folder is
+updated instead: only changed files are rewritten and stale files are removed.
+Generated names are always identical for identical programs. If the
+"stable_ids" setting is enabled, every function also gets its own id namespace,
+so that editing one function doesn't rename anything in other functions.
+Code blocks that are never run and values that are never read are removed
+from the datapack, unless the "dead_code_elimination" setting is disabled.
+User functions are kept since they can be run in-game with /function; if the
+"public_user_functions" setting is disabled, only those reachable from init,
+main, kill or clickable items are kept.
+Functions and code blocks with at most "inline_threshold" commands are copied
+into the function that runs them instead of being called (0 disables this).
+Temporary values share a few storage slots that are reused once a value has
+been read for the last time, unless the "reuse_temporaries" setting is disabled.
 
 - config set <setting> <value>: Overwrite specified setting in config
 to the new value.
@@ -39,6 +62,9 @@ is specified, all settings with their associated values will be shown.
 
 - config default: Resets all config values to their default values.
 
+- cache clear: Removes all cached syntax trees. Parsed files are cached
+(see the "ast_cache" settings) so that unchanged files skip parsing.
+
 #-----------------------------------------------------------------------#
 """
 
@@ -87,6 +113,7 @@ def sh_compile(*args) -> None:
     )
 
     verbose = COMMON_CONFIG["verbose"]
+    incremental = COMMON_CONFIG["incremental_build"]
 
     # Check if given paths are valid:
     if not os.path.isfile(path):
@@ -101,7 +128,7 @@ def sh_compile(*args) -> None:
     with open(path, 'rt', encoding='utf-8') as mcs_file:
         code = mcs_file.read()
 
-    build_datapack(code, datapack_name, output_path, verbose)
+    build_datapack(code, datapack_name, output_path, verbose, incremental=incremental)
 
 
 def sh_config(*args) -> None:
@@ -165,9 +192,19 @@ def sh_config_default(args: list) -> None:
     print("Successfully reset config to its default state")
 
 
+def sh_cache(*args) -> None:
+    if len(args) < 1 or args[0] != "clear":
+        print("Invalid arguments. Use the \"help\" command for more information.")
+        exit()
+
+    removed_count = clear_cache()
+    print(f"Removed {removed_count} cached syntax tree(s)")
+
+
 shell_functions = {
     'help': sh_help,
     'debug': sh_debug,
     'compile': sh_compile,
     'config': sh_config,
+    'cache': sh_cache,
 }